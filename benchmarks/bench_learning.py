@@ -0,0 +1,65 @@
+from common import result, measure
+import numpy as np
+import settings
+from q_table import QTable, PopulationQTable, N_STATES, N_ACTIONS
+
+# updates por geração no population_q_update: como no Train, as linhas privadas voltam pra base
+# a cada geração, então a tabela não cresce com o tempo de medida
+GENERATION_STEPS = 200
+# estados sorteados de um conjunto pequeno, como num episódio de verdade (cada dinossauro passa
+# por algumas dezenas de estados), e não da tabela inteira: mistura de linhas novas e já privadas
+WORKING_STATES = 32
+
+def run(quick=False):
+    min_time = 0.3 if quick else 1.0
+    rng = np.random.default_rng(0)
+    results = []
+
+    # update escalar (Watch/BaseAIGame.update_q_table)
+    q_table = QTable()
+    count = 10000
+    states = rng.integers(0, N_STATES, count).tolist()
+    next_states = rng.integers(0, N_STATES, count).tolist()
+    actions = rng.integers(0, N_ACTIONS, count).tolist()
+    def scalar_updates():
+        for s, a, s_prime in zip(states, actions, next_states):
+            q_table.update(s, a, 0.1, s_prime, settings.ALPHA, settings.GAMMA)
+    seconds = measure(scalar_updates, min_time)
+    results.append(result("learning", "q_table_update", count / seconds, "updates/s", True))
+
+    # update em lote com copy-on-write, igual à fase 3 do Train
+    for population_size in (50, 5000):
+        q_tables = PopulationQTable(population_size, QTable())
+        dinos = np.arange(population_size)
+        working_states = rng.choice(N_STATES, WORKING_STATES, replace=False)
+        steps = 0
+        def batch_update():
+            nonlocal steps
+            if steps == GENERATION_STEPS:
+                q_tables.reset()
+                steps = 0
+            steps += 1
+            s = rng.choice(working_states, population_size)
+            a = rng.integers(0, N_ACTIONS, population_size)
+            s_prime = rng.choice(working_states, population_size)
+            max_future_q = q_tables.lookup(dinos, s_prime).max(axis=1)
+            old_q_values = q_tables.lookup(dinos, s)[np.arange(population_size), a]
+            new_q_values = old_q_values + settings.ALPHA * (0.1 + settings.GAMMA * max_future_q - old_q_values)
+            q_tables.set_values(dinos, s, a, new_q_values)
+        seconds = measure(batch_update, min_time)
+        results.append(result("learning", "population_q_update", population_size / seconds, "updates/s", True, population=population_size))
+
+        # troca de geração: promove o melhor e volta todos para a base
+        q_tables.reset()
+        steps = 0
+        def generation_boundary():
+            batch_update()
+            q_tables.promote(0)
+            q_tables.reset()
+        seconds = measure(generation_boundary, min_time)
+        results.append(result("learning", "generation_boundary", 1e6 * seconds, "us/call", False, population=population_size))
+    return results
+
+if __name__ == '__main__':
+    for item in run():
+        print(f"{item['name']} {item['params']}: {item['value']:.0f} {item['unit']}")
@@ -0,0 +1,62 @@
+from common import result, measure, quiet, use_checkpoint_dir
+import tempfile
+import os
+import numpy as np
+from base_game import BaseAIGame
+from q_table import QTable, N_STATES, N_ACTIONS
+
+# fração dos estados visitados na tabela
+FILL_FRACTIONS = [0.0, 0.1, 0.5, 1.0]
+DELTA_ROWS = 100
+
+def make_game(directory, fill, seed=0):
+    rng = np.random.default_rng(seed)
+    q_table = QTable()
+    visited = rng.random(N_STATES) < fill
+    q_table.visited[:] = visited
+    q_table.array[visited] = rng.standard_normal((int(visited.sum()), N_ACTIONS))
+    game = BaseAIGame(None, q_table=q_table)
+    use_checkpoint_dir(game, directory)
+    return game
+
+def run(quick=False):
+    min_time = 0.3 if quick else 1.0
+    results = []
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp, quiet():
+        for fill in FILL_FRACTIONS:
+            game = make_game(tmp, fill)
+            states = len(game.q_table)
+
+            # checkpoint completo (compactação)
+            def save_full():
+                game.needs_full_checkpoint = True
+                game.save_q_table()
+            seconds = measure(save_full, min_time)
+            results.append(result("persistence", "save_q_table", 1e3 * seconds, "ms", False, states=states, kind="full"))
+
+            # delta com as linhas de uma geração típica (DELTA_ROWS estados alterados)
+            def save_delta():
+                game.q_table.mark_dirty(rng.integers(0, N_STATES, DELTA_ROWS))
+                game.save_q_table()
+            seconds = measure(save_delta, min_time)
+            results.append(result("persistence", "save_q_table", 1e3 * seconds, "ms", False, states=states, kind="delta", rows=DELTA_ROWS))
+
+            # load mapeia o arquivo; o acesso a tabela inteira mostra o custo de trazer as páginas
+            seconds = measure(game.load_q_table, min_time)
+            results.append(result("persistence", "load_q_table", 1e3 * seconds, "ms", False, states=states))
+            seconds = measure(lambda: (game.load_q_table(), float(game.q_table.array.sum())), min_time)
+            results.append(result("persistence", "load_q_table_touch", 1e3 * seconds, "ms", False, states=states))
+
+            # formato JSON antigo (cresce com o número de estados)
+            seconds = measure(game.export_q_table_json, min_time, min_runs=1)
+            results.append(result("persistence", "export_json", 1e3 * seconds, "ms", False, states=states))
+            os.remove(game.q_table_file)
+            seconds = measure(game.load_q_table, min_time, min_runs=1)
+            results.append(result("persistence", "import_json", 1e3 * seconds, "ms", False, states=states))
+            os.remove(game.q_table_json_file)
+    return results
+
+if __name__ == '__main__':
+    for item in run():
+        print(f"{item['name']} {item['params']}: {item['value']:.2f} {item['unit']}")
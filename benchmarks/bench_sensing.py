@@ -0,0 +1,56 @@
+from common import result, measure
+import settings
+from base_game import BaseAIGame
+from dino import Dino
+from q_table import QTable
+from obstacle_pool import ObstaclePool, draw_obstacle
+import random
+import sensors
+
+def make_game(seed=0):
+    # mundo avançado até ter obstáculo ao alcance dos raios
+    game = BaseAIGame(None, seed=seed, q_table=QTable())
+    dino = Dino(x=50, y=settings.GROUND_LEVEL + 60, headless=True, sim_clock=game.sim_clock)
+    while len(game.sensed_boxes(dino)[1]) == 0:
+        game.world.update()
+    return game, dino
+
+def full_pool(seed=0):
+    # pool com OBSTACLE_POOL_SIZE obstáculos espalhados da esquerda da tela até depois da direita
+    rng = random.Random(seed)
+    pool = ObstaclePool()
+    step = (settings.SCREEN_WIDTH + 200) // settings.OBSTACLE_POOL_SIZE
+    for i in range(settings.OBSTACLE_POOL_SIZE):
+        is_flying, is_double, _, altitude = draw_obstacle(rng)
+        pool.add(is_flying, is_double, i * step - settings.SCREEN_WIDTH, altitude)
+    return pool
+
+def run(quick=False):
+    min_time = 0.3 if quick else 1.0
+    game, dino = make_game()
+    results = []
+
+    seconds = measure(lambda: dino.cast_rays(*game.sensed_boxes(dino)), min_time)
+    results.append(result("sensing", "dino_cast_rays", 1e6 * seconds, "us/call", False, obstacles="in_range"))
+
+    pool = full_pool()
+    all_boxes = pool.boxes_in_range(-float('inf'), float('inf'))
+    seconds = measure(lambda: dino.cast_rays(*all_boxes), min_time)
+    results.append(result("sensing", "dino_cast_rays", 1e6 * seconds, "us/call", False, obstacles="all", count=pool.count))
+
+    dino.cast_rays(*game.sensed_boxes(dino))
+    seconds = measure(lambda: game.get_state(dino), min_time)
+    results.append(result("sensing", "get_state", 1e6 * seconds, "us/call", False))
+
+    # raycast em lote, como no Train, por tamanho de população
+    boxes, box_types = game.sensed_boxes(dino)
+    for population_size in (50, 5000):
+        origin_x = [dino.rect.centerx] * population_size
+        origin_y = [dino.rect.centery] * population_size
+        seconds = measure(lambda: sensors.cast_rays_batch(origin_x, origin_y, boxes, box_types), min_time)
+        results.append(result("sensing", "cast_rays_batch", population_size / seconds, "dinos/s", True, population=population_size))
+    return results
+
+if __name__ == '__main__':
+    for item in run():
+        print(f"{item['name']} {item['params']}: {item['value']:.2f} {item['unit']}")
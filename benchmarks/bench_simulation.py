@@ -0,0 +1,71 @@
+from common import result, quiet, measure, use_checkpoint_dir
+import tempfile
+import time
+import settings
+from train_ai import Train
+from q_table import QTable
+from world import World
+import tracemalloc
+
+POPULATIONS = [10, 50, 500, 5000]
+
+def make_trainer(population_size, seed=0, q_table_dir=None):
+    config = {
+        'ALPHA': settings.ALPHA,
+        'GAMMA': settings.GAMMA,
+        'EPSILON_INIT': settings.EPSILON_INIT,
+        'EPSILON_DECAY': settings.EPSILON_DECAY,
+        'EPSILON_MIN': settings.EPSILON_MIN,
+        'POPULATION_SIZE': population_size,
+    }
+    # tabela nova e arquivos num diretório temporário: nada do disco é lido ou sobrescrito
+    trainer = Train(None, config, seed=seed, q_table=QTable())
+    if q_table_dir is not None:
+        use_checkpoint_dir(trainer, q_table_dir)
+    return trainer
+
+def steps_per_second(trainer, min_time):
+    for _ in range(20): #aquecimento
+        trainer.update_game_state()
+    steps = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        trainer.update_game_state()
+        steps += 1
+        elapsed = time.perf_counter() - start
+    return steps / elapsed
+
+def world_update(min_time, steps=5000):
+    # passo do mundo headless (mover, descartar e criar obstáculos) e memória nova por passo no regime
+    world = World(seed=0, headless=True)
+    for _ in range(2000): #aquecimento, tela já com obstáculos
+        world.update()
+    seconds = measure(world.update, min_time)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(steps):
+        world.update()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(max(stat.size_diff, 0) for stat in after.compare_to(before, 'filename'))
+    return seconds, allocated / steps
+
+def run(quick=False):
+    min_time = 0.5 if quick else 3.0
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, quiet():
+        for population_size in POPULATIONS:
+            trainer = make_trainer(population_size, q_table_dir=tmp)
+            rate = steps_per_second(trainer, min_time)
+            results.append(result("simulation", "train_update_game_state", rate, "steps/s", True, population=population_size))
+            results.append(result("simulation", "train_dino_steps", rate * population_size, "dino-steps/s", True, population=population_size))
+    seconds, bytes_per_step = world_update(min_time)
+    results.append(result("simulation", "world_update", 1e6 * seconds, "us/step", False))
+    results.append(result("simulation", "world_update_alloc", bytes_per_step, "bytes/step", False))
+    return results
+
+if __name__ == '__main__':
+    for item in run():
+        print(f"{item['name']} {item['params']}: {item['value']:.0f} {item['unit']}")
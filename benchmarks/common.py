@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import platform
+import subprocess
+import contextlib
+import io
+
+# benchmarks rodam sem janela
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'dino_game'))
+
+import numpy as np
+import pygame
+import settings
+
+def measure(fn, min_time=1.0, min_runs=3):
+    # chama fn até passar min_time segundos (e pelo menos min_runs vezes); devolve segundos por chamada
+    fn() #aquecimento
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while runs < min_runs or elapsed < min_time:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / runs
+
+def result(group, name, value, unit, higher_is_better, **params):
+    # uma medida no formato do JSON de saída
+    return {
+        "group": group,
+        "name": name,
+        "value": float(value),
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+        "params": params,
+    }
+
+@contextlib.contextmanager
+def quiet():
+    # o treino imprime a cada geração; nos benchmarks isso só atrapalha
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def use_checkpoint_dir(game, directory):
+    # todos os arquivos do checkpoint (binário, log de deltas e JSON) dentro de directory:
+    # um benchmark nunca lê, apaga ou acrescenta nos arquivos de treino do diretório atual
+    game.q_table_file = os.path.join(directory, settings.Q_TABLE_FILE)
+    game.q_table_delta_file = os.path.join(directory, settings.Q_TABLE_DELTA_FILE)
+    game.q_table_json_file = os.path.join(directory, settings.Q_TABLE_JSON_FILE)
+    return game
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "commit": git_commit(),
+    }
@@ -0,0 +1,36 @@
+import argparse
+import json
+import sys
+
+# compara dois JSONs do run.py; sai com código 1 se alguma medida piorou além do limite
+
+def key(item):
+    return (item["group"], item["name"], json.dumps(item["params"], sort_keys=True))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="piora relativa tolerada (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = {key(item): item for item in json.load(f)["results"]}
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    for item in current:
+        old = baseline.get(key(item))
+        if old is None or old["value"] == 0:
+            continue
+        change = (item["value"] - old["value"]) / abs(old["value"])
+        worse = -change if item["higher_is_better"] else change
+        flag = "REGRESSÃO" if worse > args.threshold else ""
+        if flag:
+            regressions += 1
+        params = " ".join(f"{k}={v}" for k, v in item["params"].items())
+        print(f"{item['group']}/{item['name']} {params}: {old['value']:.2f} -> {item['value']:.2f} {item['unit']} ({change:+.1%}) {flag}")
+
+    print(f"{regressions} regressões acima de {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,42 @@
+from common import environment
+import argparse
+import json
+import time
+import bench_simulation
+import bench_sensing
+import bench_learning
+import bench_persistence
+
+SUITES = {
+    "simulation": bench_simulation,
+    "sensing": bench_sensing,
+    "learning": bench_learning,
+    "persistence": bench_persistence,
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks do Dino (headless), saída em JSON")
+    parser.add_argument("--output", default="benchmark_results.json", help="arquivo JSON de saída")
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITES), default=None, help="roda só estes grupos")
+    parser.add_argument("--quick", action="store_true", help="medições mais curtas (menos precisas)")
+    args = parser.parse_args()
+
+    results = []
+    for name, suite in SUITES.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"[bench] {name}...")
+        for item in suite.run(quick=args.quick):
+            params = " ".join(f"{k}={v}" for k, v in item["params"].items())
+            print(f"  {item['name']} {params}: {item['value']:.2f} {item['unit']}")
+            results.append(item)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "quick": args.quick,
+        "environment": environment(),
+        "results": results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"[bench] resultados salvos em {args.output}")
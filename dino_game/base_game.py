@@ -1,33 +1,58 @@
 import pygame
 import settings
 from dino import Dino
-from obstacle import Obstacle
-import random
+from world import World
+from course import default_course
+import render
+import sensors
+from q_table import QTable, encode_state, discretize_state, discretize_states, encode_observations
+import checkpoint
 import numpy as np
 import os
-import json
 
 class BaseGame:
-    def __init__(self, screen: pygame.Surface):
+    def __init__(self, screen: pygame.Surface, seed=None, course=None):
+        # screen None = modo headless (sem display, fontes ou Surfaces)
+        # course: percurso pré-gerado (course.Course); sem ele vale o settings.COURSE_NAME, ou obstáculos sorteados
         self.screen = screen
+        self.headless = screen is None
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        if self.headless:
+            self.font = None
+            self.small_font = None
+            self.text_cache = None
+            self.background = None
+            self.renderer = None
+        else:
+            # fontes criadas uma vez; textos renderizados passam pelo cache
+            self.font = render.get_font(36)
+            self.small_font = render.get_font(24)
+            self.text_cache = render.TextCache()
+            # céu e chão pré-renderizados; com o renderer, só as áreas que mudaram são redesenhadas
+            self.background = render.background_surface(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)
+            self.renderer = render.DirtyRenderer(screen, self.background) if settings.DIRTY_RECT_RENDERING else None
 
         self.running = False
         self.game_over = False
         self.score = 0
         
+        # dinossauros; os obstáculos ficam no mundo
         self.sprites = pygame.sprite.Group()
-        self.obstacles = pygame.sprite.Group()
-        self.obstacle_spawn_timer = 0
+        # velocidade, obstáculos, spawn, relógio e RNG do jogo
+        self.world = World(seed=seed, headless=self.headless, course=course if course is not None else default_course())
+
+    @property
+    def obstacles(self):
+        return self.world.obstacles
+
+    @property
+    def sim_clock(self):
+        # relógio da simulação, compartilhado com os dinossauros
+        return self.world.sim_clock
 
     def spawn_obstacle(self):
-        is_flying = random.randint(0,1)       
-        obstacle = Obstacle(is_flying=is_flying)
-        self.sprites.add(obstacle)
-        self.obstacles.add(obstacle)
-        return is_flying
+        row = self.world.spawn_obstacle()
+        return bool(self.world.pool.is_flying[row])
     
     def handle_input(self):
         pass
@@ -36,76 +61,71 @@ class BaseGame:
         if self.game_over:
             return
 
+        # relógio, obstáculos, velocidade e spawn
+        self.world.update()
         self.sprites.update()
-        Obstacle.GLOBAL_SPEED -= settings.SPEED_INCREASE
         self.score += 1
 
-        # Spawn de obstaculos
-        self.obstacle_spawn_timer += 1
-        calculated_interval = settings.SPAWN_INTERVAL + (Obstacle.GLOBAL_SPEED * settings.SPAWN_INTERVAL_SPEED_EFFECT)
-        spawn_interval = int(calculated_interval)
-        
-        if self.obstacle_spawn_timer >= spawn_interval:
-            self.spawn_obstacle()
-            self.obstacle_spawn_timer = 0
-
     def draw_info(self):
         #score
-        score_text = self.font.render(f"Score: {int(self.score)}", True, settings.COLOR_TEXT)
-        self.screen.blit(score_text, (10, 10))
+        self.mark_dirty(self.text_cache.blit(self.screen, self.font, f"Score: {int(self.score)}", settings.COLOR_TEXT, (10, 10)))
+
+    def draw_background(self):
+        if self.renderer is None:
+            self.screen.blit(self.background, (0, 0))
+            return
+        # o overlay de game over cobre a tela toda: redesenha tudo
+        if self.game_over:
+            self.renderer.invalidate()
+        self.renderer.erase()
+
+    def mark_dirty(self, rect):
+        if self.renderer is not None:
+            self.renderer.mark(rect)
+
+    def present(self):
+        if self.renderer is None:
+            pygame.display.flip()
+        else:
+            self.renderer.present()
 
     def draw_game(self):
-        self.draw_info()
-        self.screen.fill(settings.COLOR_SKY)
-        pygame.draw.rect(self.screen, settings.COLOR_GROUND, pygame.Rect(0, settings.GROUND_LEVEL, settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT - settings.GROUND_LEVEL))
+        self.draw_background()
         
         for entity in self.sprites:
-            entity.draw(self.screen)
+            self.mark_dirty(entity.draw(self.screen))
+        for obstacle in self.obstacles:
+            self.mark_dirty(obstacle.draw(self.screen))
 
-        score_text = self.font.render(f"Score: {int(self.score)}", True, settings.COLOR_TEXT)
-        self.screen.blit(score_text, (10, 10))
+        self.draw_info()
 
         if self.game_over:    
             self.draw_game_over()
     
     def draw_game_over(self):
-        overlay = pygame.Surface((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128)) 
+        overlay = render.solid_surface(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT, (0, 0, 0, 128), per_pixel_alpha=True)
         self.screen.blit(overlay, (0,0))
 
-        game_over_text = self.font.render("Game Over", True, (255,255,255))
-        text_rect = game_over_text.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 - 30))
-        self.screen.blit(game_over_text, text_rect)
-        
-        final_score_text = self.small_font.render(f"Final Score: {int(self.score)}", True, (255,255,255))
-        score_rect = final_score_text.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 + 10))
-        self.screen.blit(final_score_text, score_rect)
-        restart_text = self.small_font.render("'R' - Restart | ESC - Menu", True, (200,200,200))
-        restart_rect = restart_text.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 + 50))
-        self.screen.blit(restart_text, restart_rect)
+        self.text_cache.blit(self.screen, self.font, "Game Over", (255,255,255), center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 - 30))
+        self.text_cache.blit(self.screen, self.small_font, f"Final Score: {int(self.score)}", (255,255,255), center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 + 10))
+        self.text_cache.blit(self.screen, self.small_font, "'R' - Restart | ESC - Menu", (200,200,200), center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 + 50))
         
+    def sensed_boxes(self, dino):
+        # blocos e tipos só dos obstáculos que os raios do dino alcançam
+        return self.world.boxes_in_range(*sensors.ray_x_window(dino.rect.centerx))
+
     def check_collisions(self, dino):
-        hit_obstacles = []
-        for obstacle in self.obstacles:
-            collided = dino.rect.colliderect(obstacle.rect)
-            
-            if not collided and obstacle.is_double:
-                collided = dino.rect.colliderect(obstacle.rect2)
-            
-            if collided:
-                hit_obstacles.append(obstacle)
-        return hit_obstacles
+        # só os obstáculos na faixa de x do dino
+        return self.world.collides(dino.rect)
 
     def reset_game(self):
         self.score = 0
-        self.obstacle_spawn_timer = 0
         self.game_over = False
-        
-        for obstacle in self.obstacles:
-            obstacle.kill()
-        self.obstacles.empty()
 
-        Obstacle.GLOBAL_SPEED = settings.OBSTACLE_SPEED # Reseta velocidade global
+        # remove obstáculos e reseta velocidade, spawn e relógio do mundo
+        self.world.reset()
+        if self.renderer is not None:
+            self.renderer.invalidate() #tira o overlay de game over da tela
 
     def run(self):
         self.running = True
@@ -115,18 +135,28 @@ class BaseGame:
             self.handle_input()
             self.update_game_state()
             self.draw_game()
-            pygame.display.flip()
+            self.present()
             
             self.clock.tick(settings.FPS)
 
         return self.score
 
 class BaseAIGame(BaseGame):
-    def __init__(self, screen: pygame.Surface, custom_config=None):
-        super().__init__(screen)
-        self.q_table = {}
-        self.q_table_file = "dino_q_table.json"
-        self.distance_bin_edges = np.linspace(0, settings.RAY_LENGTH, settings.DISTANCE_BINS + 1)
+    def __init__(self, screen: pygame.Surface, custom_config=None, seed=None, q_table=None, course=None, q_table_mmap_mode=None):
+        super().__init__(screen, seed, course)
+        self.q_table = QTable()
+        # None: o checkpoint é lido todo pra memória (treino: grava na tabela e substitui o arquivo)
+        # 'c': mapeado copy-on-write, pra quem só lê (Watch, Versus, evaluate)
+        self.q_table_mmap_mode = q_table_mmap_mode
+        self.q_table_file = settings.Q_TABLE_FILE
+        self.q_table_json_file = settings.Q_TABLE_JSON_FILE
+        self.q_table_delta_file = settings.Q_TABLE_DELTA_FILE
+        self.checkpoint_writer = None #criado no primeiro save em segundo plano
+        # checkpoints: id do último gravado, deltas desde o último completo
+        self.checkpoint_id = 0
+        self.deltas_since_compaction = 0
+        self.needs_full_checkpoint = True #sem base binária válida, o próximo save é completo
+        self.saved_progress = None #(epsilon, episódios) do último save, pra não gravar delta vazio
 
         # inicializar parametros
         self.epsilon = settings.EPSILON_INIT
@@ -136,7 +166,11 @@ class BaseAIGame(BaseGame):
         self.epsilon_min = settings.EPSILON_MIN
 
         self.current_episode = 0
-        self.load_q_table()
+        if q_table is not None:
+            # tabela já pronta (ex.: memória compartilhada do treino paralelo), não lê do disco
+            self.q_table = q_table
+        else:
+            self.load_q_table()
 
         if custom_config:
             if 'ALPHA' in custom_config:
@@ -153,46 +187,23 @@ class BaseAIGame(BaseGame):
                 self.population_size = custom_config['POPULATION_SIZE']
 
 
-    def discretize_value(self, value, bin_edges):
-        idx = np.digitize(value, bin_edges[1:-1])
-        return idx
-
     def get_state(self, dino: Dino): 
-        state_components = []
-
-        min_ground_dist = float('inf')
-        min_flying_dist = float('inf')
-
-        for ray in dino.rays:
-            if ray['hit']:
-                if ray['obstacle_type'] == 'ground':
-                    min_ground_dist = min(min_ground_dist, ray['distance'])
-                elif ray['obstacle_type'] == 'flying':
-                    if ray['distance'] < min_flying_dist:
-                        min_flying_dist = ray['distance']
-        
-        actual_ground_dist = min(min_ground_dist, settings.RAY_LENGTH)
-        actual_flying_dist = min(min_flying_dist, settings.RAY_LENGTH)
+        # lê a observação do último cast_rays (obstáculos mais próximos já calculados)
+        # bins pelas tabelas pré-calculadas do q_table (distâncias acima de RAY_LENGTH caem no último bin)
+        observation = dino.observation
+        return discretize_state(observation.ground_distance, observation.flying_distance, dino.is_crouching, dino.velocity_y, self.world.speed)
 
-        ground_dist_bin = self.discretize_value(max(0, actual_ground_dist), self.distance_bin_edges)
-        flying_dist_bin = self.discretize_value(max(0, actual_flying_dist), self.distance_bin_edges)
-        
-        is_crouching_state = 1 if dino.is_crouching else 0
-        
-        dino_vy_bin = self.discretize_value(dino.velocity_y, settings.VELOCITY_BINS)
-        game_speed_bin = self.discretize_value(Obstacle.GLOBAL_SPEED, settings.GAME_SPEED_BINS)
-        
-        state_components.extend([
-            ground_dist_bin,
-            flying_dist_bin,
-            is_crouching_state,
-            dino_vy_bin,
-            game_speed_bin
-        ])
-        return tuple(state_components)
+    def get_states(self, ground_dist, flying_dist, is_crouching, velocity_y):
+        # versão em lote do get_state: recebe arrays (N,) e devolve os estados (N, 5)
+        return discretize_states(ground_dist, flying_dist, is_crouching, velocity_y, self.world.speed)
+
+    def get_state_ids(self, ground_dist, flying_dist, is_crouching, velocity_y):
+        # igual ao get_states, mas já devolve os ids empacotados (N,)
+        return encode_observations(ground_dist, flying_dist, is_crouching, velocity_y, self.world.speed)
 
     def choose_action(self, state_tuple):
-        q_values = self.q_table.get(state_tuple, [0.0, 0.0, 0.0, 0.0])
+        # estados nunca visitados têm a linha zerada, igual ao default antigo
+        q_values = self.q_table.array[encode_state(state_tuple)]
         return np.argmax(q_values)
     
     def perform_action(self, dino, action):
@@ -223,106 +234,128 @@ class BaseAIGame(BaseGame):
                         self.game_over = False 
 
     def load_q_table(self):
-        if os.path.exists(self.q_table_file):
-            try:
-                with open(self.q_table_file, 'r') as f:
-                    data = json.load(f)
-                    loaded_q_table_str_keys = data.get("q_table", {})
-                    self.q_table = {}
-                    for k_str, v_list in loaded_q_table_str_keys.items():
-                        # v_list são os Q-values (lista de floats)
-                        try:
-                            # Processamento da chave k_str
-                            if 'np.int64' in k_str:
-                                # numpy int
-                                nums = []
-                                for part in k_str.strip('()').split(','):
-                                    part = part.strip()
-                                    if 'np.int64' in part:
-                                        num_str = part.split('(')[1].split(')')[0]
-                                        nums.append(int(num_str))
-                                    else:
-                                        nums.append(int(part))
-                                state_parts = tuple(nums)
-                            else:
-                                # python Int
-                                state_parts = tuple(map(int, k_str.strip('()').split(',')))
-                            
-                            final_v_list = list(v_list)
-
-                            self.q_table[state_parts] = final_v_list
-
-                        except Exception as e:
-                            print(f"Erro em Q-table key: {k_str} ou valor: {v_list} ({e})")
-
-                #CARREGA PARAMETROs
-                self.epsilon = data.get("epsilon", settings.EPSILON_INIT)
-                self.current_episode = data.get("total_episodes_trained", 0)
-                training_params = data.get("training_params", {})
-                self.alpha = training_params.get("alpha", settings.ALPHA)
-                self.gamma = training_params.get("gamma", settings.GAMMA)
-                self.epsilon_decay = training_params.get("epsilon_decay", settings.EPSILON_DECAY)
-                self.epsilon_min = training_params.get("epsilon_min", settings.EPSILON_MIN)
-                self.population_size = training_params.get("population_size", settings.POPULATION_SIZE)
-
-                print(f"Q-table carregada.")
-            except Exception as e:
-                print(f"Erro ao carregar Q-table: {e}. Criando uma nova.")
-                self.q_table = {}
+        try:
+            if os.path.exists(self.q_table_file):
+                # checkpoint binário (em memória ou mapeado), mais os deltas gravados depois dele
+                self.q_table, data = checkpoint.read_checkpoint(self.q_table_file, self.q_table_mmap_mode)
+                self.checkpoint_id = data.get("checkpoint_id", 0)
+                self.deltas_since_compaction = 0
+                self.needs_full_checkpoint = False
+                if os.path.exists(self.q_table_delta_file):
+                    applied, self.checkpoint_id, delta_data, complete = checkpoint.replay_deltas(self.q_table, self.q_table_delta_file, self.checkpoint_id)
+                    if delta_data is not None:
+                        data.update(delta_data)
+                    self.deltas_since_compaction = applied
+                    # log com final incompleto: o próximo save compacta e recomeça o log
+                    self.needs_full_checkpoint = not complete
+                self.saved_progress = (data.get("epsilon"), data.get("total_episodes_trained"))
+            elif os.path.exists(self.q_table_json_file):
+                # importa o JSON antigo, o próximo save já grava no formato binário
+                self.q_table, data = checkpoint.read_json_q_table(self.q_table_json_file)
+            else:
+                print("Nenhuma Q-table encontrada. Iniciando uma nova")
+                self.q_table = QTable()
                 self.epsilon = settings.EPSILON_INIT
                 self.current_episode = 0
-        else:
-            print("Nenhuma Q-table encontrada. Iniciando uma nova")
-            self.q_table = {} 
+                return
+
+            #CARREGA PARAMETROs
+            self.epsilon = data.get("epsilon", settings.EPSILON_INIT)
+            self.current_episode = data.get("total_episodes_trained", 0)
+            training_params = data.get("training_params", {})
+            self.alpha = training_params.get("alpha", settings.ALPHA)
+            self.gamma = training_params.get("gamma", settings.GAMMA)
+            self.epsilon_decay = training_params.get("epsilon_decay", settings.EPSILON_DECAY)
+            self.epsilon_min = training_params.get("epsilon_min", settings.EPSILON_MIN)
+            self.population_size = training_params.get("population_size", settings.POPULATION_SIZE)
+
+            print(f"Q-table carregada.")
+        except Exception as e:
+            print(f"Erro ao carregar Q-table: {e}. Criando uma nova.")
+            self.q_table = QTable()
             self.epsilon = settings.EPSILON_INIT
             self.current_episode = 0
+            self.needs_full_checkpoint = True
 
     def update_q_table(self, state, action, reward, next_state):
-        default_q_list = [0.0, 0.0, 0.0, 0.0]
-
-        current_q_values_from_table = self.q_table.get(state, default_q_list)
-        current_q_values = list(current_q_values_from_table) # Cria cópia para modificação
+        #Atualiza o Q-value usando a formula Q-learning, direto no array
+        self.q_table.update(encode_state(state), action, reward, encode_state(next_state), settings.ALPHA, settings.GAMMA)
+
+    def training_data(self):
+        # parâmetros salvos junto com a Q-table
+        return {
+            "epsilon": float(self.epsilon),
+            "total_episodes_trained": int(self.current_episode),
+            #parametros de trino
+            "training_params": {
+                "alpha": float(self.alpha),
+                "gamma": float(self.gamma),
+                "epsilon_decay": float(self.epsilon_decay),
+                "epsilon_min": float(self.epsilon_min),
+                "population_size": int(getattr(self, 'population_size', settings.POPULATION_SIZE))
+            }
+        }
+
+    def save_q_table(self, background=False):
+        # só as linhas alteradas vão para o log de deltas; a cada CHECKPOINT_COMPACT_EVERY deltas
+        # (ou sem base binária) grava a tabela completa e apaga o log
+        if self.checkpoint_writer is not None and self.checkpoint_writer.take_failed():
+            # um save em segundo plano falhou: o log pode ter perdido linhas
+            self.needs_full_checkpoint = True
+        full = self.needs_full_checkpoint or self.deltas_since_compaction >= settings.CHECKPOINT_COMPACT_EVERY
+        data = self.training_data()
+        progress = (data["epsilon"], data["total_episodes_trained"])
+
+        if full:
+            self.q_table.take_dirty()
+            self.deltas_since_compaction = 0
+            self.needs_full_checkpoint = False
+        else:
+            # cópia só das linhas que mudaram
+            state_ids = self.q_table.take_dirty()
+            if len(state_ids) == 0 and progress == self.saved_progress:
+                return #nada mudou desde o último save
+            rows = self.q_table.array[state_ids]
+            visited = self.q_table.visited[state_ids]
+            # sem linhas, o registro só atualiza epsilon e episódios: não conta pra compactação
+            if len(state_ids):
+                self.deltas_since_compaction += 1
+        self.checkpoint_id += 1
+        self.saved_progress = progress
+
+        if background:
+            # snapshot agora, gravação numa thread: o treino não para
+            if self.checkpoint_writer is None:
+                self.checkpoint_writer = checkpoint.CheckpointWriter()
+            if full:
+                self.checkpoint_writer.submit(self.q_table_file, self.q_table, data, checkpoint_id=self.checkpoint_id, delta_path=self.q_table_delta_file)
+            else:
+                self.checkpoint_writer.submit_delta(self.q_table_delta_file, self.checkpoint_id, state_ids, rows, visited, data)
+            return
 
-        self.q_table[state] = current_q_values
+        # um save em segundo plano ainda em andamento não pode sobrescrever este depois
+        self.flush_checkpoints()
+        try:
+            if full:
+                checkpoint.write_full_checkpoint(self.q_table_file, self.q_table, data, self.checkpoint_id, self.q_table_delta_file)
+                print(f"Q-table salvo em {self.q_table_file}")
+            else:
+                checkpoint.append_delta(self.q_table_delta_file, self.checkpoint_id, state_ids, rows, visited, data)
+                print(f"Q-table salvo em {self.q_table_delta_file} ({len(state_ids)} estados alterados)")
+        except Exception as e:
+            # o que não foi gravado volta a ser pendente; o próximo save é completo
+            self.needs_full_checkpoint = True
+            print(f"Erro ao salvar a Q-Table: {e}")
 
-        old_q_value = current_q_values[action]
-        
-        next_q_values_from_table = self.q_table.get(next_state, default_q_list)
-        next_q_values = list(next_q_values_from_table) # Cria cópia
-        self.q_table[next_state] = next_q_values 
-        
-        # Calcula o maximo futuro q_value
-        max_future_q = np.max(next_q_values)
-        
-        #Atualiza o Q-value usando a formula Q-learning
-        new_q_value = old_q_value + settings.ALPHA * (reward + settings.GAMMA * max_future_q - old_q_value)
-        current_q_values[action] = new_q_value
-        self.q_table[state] = current_q_values 
+    def flush_checkpoints(self):
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.flush()
 
-    def save_q_table(self):
+    def export_q_table_json(self, path=None):
+        path = path or self.q_table_json_file
+        self.flush_checkpoints()
         try:
-            q_table_str_keys = {}
-            for k, v in self.q_table.items():
-                # Converte cada elemento na tuple key pra um int
-                key_as_int = tuple(int(x) for x in k)
-                q_table_str_keys[str(key_as_int)] = v # v será uma lista de 4 floats
-                
-            data = {
-                "q_table": q_table_str_keys,
-                "epsilon": float(self.epsilon),
-                "total_episodes_trained": int(self.current_episode),
-                #parametros de trino
-                "training_params": {
-                    "alpha": float(self.alpha),
-                    "gamma": float(self.gamma),
-                    "epsilon_decay": float(self.epsilon_decay),
-                    "epsilon_min": float(self.epsilon_min),
-                    "population_size": int(getattr(self, 'population_size', settings.POPULATION_SIZE))
-                }
-            }
-
-            with open(self.q_table_file, 'w') as f:
-                json.dump(data, f, indent=4) #indent para melhor leitura do JSON
-            print(f"Q-table salvo em {self.q_table_file}")
+            checkpoint.write_json_q_table(path, self.q_table, self.training_data())
+            print(f"Q-table exportada em {path}")
         except Exception as e:
-            print(f"Erro ao salvar a Q-Table: {e}")
+            print(f"Erro ao exportar a Q-Table: {e}")
@@ -0,0 +1,399 @@
+import numpy as np
+import struct
+import json
+import zlib
+import os
+import tempfile
+import stat
+import threading
+import time
+import settings
+from q_table import QTable, STATE_DIMS, N_STATES, N_ACTIONS
+
+# Checkpoint binário da Q-table:
+#   header fixo de HEADER_SIZE bytes (parâmetros de treino, epsilon, episódios, formato do estado)
+#   Q-values float32 (N_STATES, N_ACTIONS) em HEADER_SIZE, mapeável com np.memmap
+#   máscara de estados visitados uint8 (N_STATES,) logo depois
+# o último campo do header (id do checkpoint) ocupa o espaço reservado: arquivos antigos leem 0
+MAGIC = b"DQTB"
+VERSION = 1
+HEADER_FORMAT = "<4sHH5B3xIdddddIQQ"
+HEADER_SIZE = 128
+
+# Log de deltas (append-only), ao lado do checkpoint completo:
+#   cada registro = header DELTA_FORMAT (quantidade de estados, id, epsilon, episódios, CRC32)
+#   + ids dos estados int32 (k,) + Q-values float32 (k, N_ACTIONS) + visitados uint8 (k,)
+# só as linhas que mudaram desde o checkpoint anterior; registros com id <= id da base já estão nela
+# o CRC cobre os campos do header e o corpo; os ids depois da base precisam ser seguidos (base + 1, + 2...)
+# registros antigos (LEGACY_DELTA_MAGIC, sem CRC) ainda são lidos
+DELTA_MAGIC = b"DQTC"
+DELTA_FIELDS_FORMAT = "<IQdQ"
+DELTA_FORMAT = "<4s" + DELTA_FIELDS_FORMAT[1:] + "I"
+DELTA_HEADER_SIZE = struct.calcsize(DELTA_FORMAT)
+LEGACY_DELTA_MAGIC = b"DQTD"
+LEGACY_DELTA_HEADER_SIZE = 4 + struct.calcsize(DELTA_FIELDS_FORMAT)
+DELTA_ROW_SIZE = 4 + 4 * N_ACTIONS + 1
+
+def q_values_offset():
+    return HEADER_SIZE
+
+def visited_offset():
+    return HEADER_SIZE + N_STATES * N_ACTIONS * 4
+
+def _pack_header(data, checkpoint_id=0):
+    training_params = data.get("training_params", {})
+    header = struct.pack(
+        HEADER_FORMAT,
+        MAGIC, VERSION, N_ACTIONS, *STATE_DIMS, N_STATES,
+        float(training_params.get("alpha", settings.ALPHA)),
+        float(training_params.get("gamma", settings.GAMMA)),
+        float(data.get("epsilon", settings.EPSILON_INIT)),
+        float(training_params.get("epsilon_decay", settings.EPSILON_DECAY)),
+        float(training_params.get("epsilon_min", settings.EPSILON_MIN)),
+        int(training_params.get("population_size", settings.POPULATION_SIZE)),
+        int(data.get("total_episodes_trained", 0)),
+        int(checkpoint_id),
+    )
+    return header.ljust(HEADER_SIZE, b"\0")
+
+def read_header(path):
+    # devolve os parâmetros no mesmo formato do JSON (sem a q_table)
+    with open(path, 'rb') as f:
+        raw = f.read(struct.calcsize(HEADER_FORMAT))
+    fields = struct.unpack(HEADER_FORMAT, raw)
+    magic, version, n_actions = fields[0:3]
+    state_dims = tuple(fields[3:8])
+    n_states, alpha, gamma, epsilon, epsilon_decay, epsilon_min, population_size, total_episodes, checkpoint_id = fields[8:]
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} não é um checkpoint de Q-table")
+    if version != VERSION:
+        raise ValueError(f"versão de checkpoint não suportada: {version}")
+    if state_dims != STATE_DIMS or n_states != N_STATES or n_actions != N_ACTIONS:
+        raise ValueError(f"formato do estado {state_dims} não bate com os settings atuais {STATE_DIMS}")
+
+    return {
+        "epsilon": epsilon,
+        "total_episodes_trained": total_episodes,
+        "checkpoint_id": checkpoint_id,
+        "training_params": {
+            "alpha": alpha,
+            "gamma": gamma,
+            "epsilon_decay": epsilon_decay,
+            "epsilon_min": epsilon_min,
+            "population_size": population_size
+        }
+    }
+
+# umask lido uma vez na importação: trocar e restaurar a cada save não é seguro com a thread do CheckpointWriter
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _file_mode(path):
+    # permissões que o destino deve ter: as do arquivo atual, ou as de um open() novo (0666 menos o umask)
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+def atomic_open(path, mode):
+    # arquivo temporário no mesmo diretório; atomic_commit renomeia por cima do destino
+    # um crash no meio do save deixa o arquivo antigo intacto
+    # o mkstemp cria com 0600 e o os.replace mantém: o temporário já nasce com as permissões do destino
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        os.chmod(tmp_path, _file_mode(path))
+    except BaseException:
+        os.close(fd)
+        os.remove(tmp_path)
+        raise
+    return os.fdopen(fd, mode), tmp_path
+
+def atomic_commit(f, tmp_path, path):
+    try:
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        f.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_checkpoint(path, q_table, data, checkpoint_id=0):
+    # escreve num arquivo temporário e renomeia: quem estiver com o arquivo antigo mapeado não é afetado
+    f, tmp_path = atomic_open(path, 'wb')
+    try:
+        f.write(_pack_header(data, checkpoint_id))
+        f.write(np.ascontiguousarray(q_table.array, dtype=np.float32).tobytes())
+        f.write(np.ascontiguousarray(q_table.visited, dtype=np.uint8).tobytes())
+    except BaseException:
+        f.close()
+        os.remove(tmp_path)
+        raise
+    atomic_commit(f, tmp_path, path)
+
+def write_full_checkpoint(path, q_table, data, checkpoint_id, delta_path=None):
+    # compactação: a base nova já contém todos os deltas, então o log pode ser apagado
+    # se cair entre os dois passos, os deltas antigos têm id <= id da base e são ignorados
+    write_checkpoint(path, q_table, data, checkpoint_id)
+    if delta_path and os.path.exists(delta_path):
+        os.remove(delta_path)
+
+def append_delta(path, checkpoint_id, state_ids, rows, visited, data):
+    state_ids = np.ascontiguousarray(state_ids, dtype=np.int32)
+    fields = (
+        len(state_ids), int(checkpoint_id),
+        float(data.get("epsilon", settings.EPSILON_INIT)),
+        int(data.get("total_episodes_trained", 0)),
+    )
+    body = b"".join((
+        state_ids.tobytes(),
+        np.ascontiguousarray(rows, dtype=np.float32).tobytes(),
+        np.ascontiguousarray(visited, dtype=np.uint8).tobytes(),
+    ))
+    crc = zlib.crc32(body, zlib.crc32(struct.pack(DELTA_FIELDS_FORMAT, *fields)))
+    record = memoryview(struct.pack(DELTA_FORMAT, DELTA_MAGIC, *fields, crc) + body)
+    # sem buffer: depois de um erro não sobra nada pra ser gravado no close, depois do truncate
+    with open(path, 'ab', buffering=0) as f:
+        start = f.seek(0, os.SEEK_END)
+        try:
+            while record:
+                record = record[f.write(record):]
+            os.fsync(f.fileno())
+        except BaseException:
+            # sem espaço no disco etc.: tira o registro pela metade, senão os próximos appends
+            # ficariam depois de lixo
+            try:
+                f.truncate(start)
+            except OSError:
+                pass
+            raise
+
+def read_deltas(path, with_rows=True):
+    # percorre o log até o primeiro registro incompleto (queda no meio do append) ou corrompido
+    # cada registro vem com o offset onde ele termina no arquivo
+    with open(path, 'rb') as f:
+        while True:
+            magic = f.read(4)
+            if magic == DELTA_MAGIC:
+                fields = f.read(DELTA_HEADER_SIZE - 4)
+                if len(fields) < DELTA_HEADER_SIZE - 4:
+                    return
+                count, checkpoint_id, epsilon, total_episodes, crc = struct.unpack("<" + DELTA_FORMAT[3:], fields)
+                fields = fields[:-4]
+            elif magic == LEGACY_DELTA_MAGIC:
+                fields = f.read(LEGACY_DELTA_HEADER_SIZE - 4)
+                if len(fields) < LEGACY_DELTA_HEADER_SIZE - 4:
+                    return
+                count, checkpoint_id, epsilon, total_episodes = struct.unpack(DELTA_FIELDS_FORMAT, fields)
+                crc = None
+            elif len(magic) < 4:
+                return
+            else:
+                print(f"Log de deltas {path} corrompido, ignorando o resto")
+                return
+            body_size = count * DELTA_ROW_SIZE
+            body = f.read(body_size)
+            if len(body) < body_size:
+                return
+            if crc is not None and zlib.crc32(body, zlib.crc32(fields)) != crc:
+                print(f"Log de deltas {path} corrompido (checksum), ignorando o resto")
+                return
+            data = {"epsilon": epsilon, "total_episodes_trained": total_episodes}
+            if not with_rows:
+                yield checkpoint_id, data, None, None, None, f.tell()
+                continue
+            state_ids = np.frombuffer(body, dtype=np.int32, count=count)
+            rows = np.frombuffer(body, dtype=np.float32, count=count * N_ACTIONS, offset=4 * count).reshape(count, N_ACTIONS)
+            visited = np.frombuffer(body, dtype=np.uint8, count=count, offset=(4 + 4 * N_ACTIONS) * count).astype(bool)
+            yield checkpoint_id, data, state_ids, rows, visited, f.tell()
+
+def replay_deltas(q_table, path, base_id):
+    # aplica os deltas mais novos que a base, em sequência; para no primeiro id que pula
+    # (um delta perdido: os seguintes não podem ser aplicados sem ele)
+    # devolve (deltas aplicados, último id, dados do último, log íntegro)
+    applied = 0
+    last_id = base_id
+    last_data = None
+    valid_size = 0
+    for checkpoint_id, data, state_ids, rows, visited, end in read_deltas(path):
+        if checkpoint_id > base_id:
+            if checkpoint_id != last_id + 1:
+                print(f"Log de deltas {path}: falta o checkpoint {last_id + 1}, ignorando o resto")
+                return applied, last_id, last_data, False
+            q_table.array[state_ids] = rows
+            q_table.visited[state_ids] = visited
+            applied += 1
+            last_id = checkpoint_id
+            last_data = data
+        valid_size = end
+    # sobra no fim = append interrompido ou registro corrompido; o que vier depois não seria lido
+    complete = valid_size == os.path.getsize(path)
+    return applied, last_id, last_data, complete
+
+def read_checkpoint(path, mmap_mode='c'):
+    # mmap_mode 'c' (copy-on-write): leitura sob demanda, escritas ficam só na memória
+    # mmap_mode None: lê tudo pra memória
+    data = read_header(path)
+    if mmap_mode is None:
+        with open(path, 'rb') as f:
+            f.seek(q_values_offset())
+            array = np.fromfile(f, dtype=np.float32, count=N_STATES * N_ACTIONS).reshape(N_STATES, N_ACTIONS)
+            visited = np.fromfile(f, dtype=np.uint8, count=N_STATES).astype(bool)
+    else:
+        array = np.memmap(path, dtype=np.float32, mode=mmap_mode, offset=q_values_offset(), shape=(N_STATES, N_ACTIONS))
+        visited = np.memmap(path, dtype=np.bool_, mode=mmap_mode, offset=visited_offset(), shape=(N_STATES,))
+    return QTable(array, visited), data
+
+def read_json_q_table(path):
+    # importação do formato JSON antigo (chaves de tupla em string)
+    with open(path, 'r') as f:
+        data = json.load(f)
+    loaded_q_table_str_keys = data.pop("q_table", {})
+    q_table = QTable()
+    for k_str, v_list in loaded_q_table_str_keys.items():
+        # v_list são os Q-values (lista de floats)
+        try:
+            # Processamento da chave k_str
+            if 'np.int64' in k_str:
+                # numpy int
+                nums = []
+                for part in k_str.strip('()').split(','):
+                    part = part.strip()
+                    if 'np.int64' in part:
+                        num_str = part.split('(')[1].split(')')[0]
+                        nums.append(int(num_str))
+                    else:
+                        nums.append(int(part))
+                state_parts = tuple(nums)
+            else:
+                # python Int
+                state_parts = tuple(map(int, k_str.strip('()').split(',')))
+
+            q_table[state_parts] = list(v_list)
+
+        except Exception as e:
+            print(f"Erro em Q-table key: {k_str} ou valor: {v_list} ({e})")
+    return q_table, data
+
+def write_json_q_table(path, q_table, data):
+    # exportação para o formato JSON antigo
+    q_table_str_keys = {}
+    for k, v in q_table.items():
+        # Converte cada elemento na tuple key pra um int
+        key_as_int = tuple(int(x) for x in k)
+        q_table_str_keys[str(key_as_int)] = [float(x) for x in v] # lista de 4 floats
+
+    json_data = dict(data)
+    json_data["q_table"] = q_table_str_keys
+    f, tmp_path = atomic_open(path, 'w')
+    try:
+        json.dump(json_data, f, indent=4) #indent para melhor leitura do JSON
+    except BaseException:
+        f.close()
+        os.remove(tmp_path)
+        raise
+    atomic_commit(f, tmp_path, path)
+
+class CheckpointWriter:
+    # salva checkpoints numa thread em segundo plano
+    # o loop principal só copia o que vai ser gravado (snapshot da tabela ou as linhas do delta);
+    # um snapshot completo substitui tudo que ainda não começou a ser gravado, deltas entram na fila
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = []
+        self.busy = False
+        self.thread = None
+        self.saves = 0
+        self.failed = False #algum save falhou (quem usa decide se o próximo precisa ser completo; ver take_failed)
+        self.last_latency = 0.0 #segundos do último save (gravação em segundo plano)
+
+    def _enqueue(self, job, replaces_pending):
+        with self.condition:
+            if replaces_pending:
+                self.pending.clear()
+            self.pending.append(job)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def submit(self, path, q_table, data, json_path=None, checkpoint_id=0, delta_path=None):
+        snapshot = q_table.copy()
+        def job():
+            write_full_checkpoint(path, snapshot, data, checkpoint_id, delta_path)
+            if json_path:
+                write_json_q_table(json_path, snapshot, data)
+            print(f"Q-table salvo em {path} (segundo plano)")
+        job.full = True
+        self._enqueue(job, replaces_pending=True)
+
+    def submit_delta(self, path, checkpoint_id, state_ids, rows, visited, data):
+        def job():
+            append_delta(path, checkpoint_id, state_ids, rows, visited, data)
+        job.full = False
+        self._enqueue(job, replaces_pending=False)
+
+    def take_failed(self):
+        # se algum save falhou desde a última chamada (e zera o aviso)
+        with self.condition:
+            failed = self.failed
+            self.failed = False
+            return failed
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                job = self.pending.pop(0)
+                self.busy = True
+            start = time.perf_counter()
+            error = None
+            try:
+                job()
+            except Exception as e:
+                error = e
+                print(f"Erro ao salvar a Q-Table em segundo plano: {e}")
+            finally:
+                with self.condition:
+                    if error is None:
+                        self.saves += 1
+                    else:
+                        # deltas na fila dependem do que falhou: descarta até o próximo checkpoint completo
+                        self.failed = True
+                        while self.pending and not self.pending[0].full:
+                            self.pending.pop(0)
+                    self.last_latency = time.perf_counter() - start
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def flush(self):
+        # espera os saves pendentes terminarem
+        with self.condition:
+            while self.pending or self.busy:
+                self.condition.wait()
+
+def read_training_data(path = settings.Q_TABLE_FILE, json_path = settings.Q_TABLE_JSON_FILE, delta_path = settings.Q_TABLE_DELTA_FILE):
+    # só os parâmetros salvos (binário + deltas, ou o JSON antigo), ou None se não houver Q-table
+    if os.path.exists(path):
+        data = read_header(path)
+        if os.path.exists(delta_path):
+            # epsilon e episódios do último delta da sequência (como no replay_deltas)
+            last_id = data["checkpoint_id"]
+            for checkpoint_id, delta_data, _, _, _, _ in read_deltas(delta_path, with_rows=False):
+                if checkpoint_id <= data["checkpoint_id"]:
+                    continue
+                if checkpoint_id != last_id + 1:
+                    break
+                data.update(delta_data)
+                last_id = checkpoint_id
+        return data
+    if os.path.exists(json_path):
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        data.pop("q_table", None)
+        return data
+    return None
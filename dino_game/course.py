@@ -0,0 +1,95 @@
+import numpy as np
+import random
+import argparse
+import os
+import settings
+import checkpoint
+from obstacle_pool import draw_obstacle
+
+# Percursos pré-gerados: a sequência de obstáculos (voador, duplo, deslocamento em x, altitude)
+# sorteada uma vez a partir de uma seed e guardada em arrays compactos. Um World com percurso lê
+# o próximo obstáculo daqui em vez de sortear, e volta ao começo a cada reset: todo episódio,
+# toda política e todo build veem os mesmos obstáculos. O momento do spawn não é sorteado
+# (só depende da velocidade), então o percurso define o jogo inteiro.
+class Course:
+    def __init__(self, name, seed, is_flying, is_double, offsets, altitudes):
+        self.name = name
+        self.seed = seed
+        self.is_flying = np.asarray(is_flying, dtype=bool)
+        self.is_double = np.asarray(is_double, dtype=bool)
+        self.offsets = np.asarray(offsets, dtype=np.int16)
+        self.altitudes = np.asarray(altitudes, dtype=np.int16)
+        # cópia em listas Python pro spawn (um obstáculo por vez)
+        self._rows = list(zip(self.is_flying.tolist(), self.is_double.tolist(), self.offsets.tolist(), self.altitudes.tolist()))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def obstacle(self, index):
+        # (voador, duplo, deslocamento, altitude); depois do último obstáculo o percurso recomeça
+        return self._rows[index % len(self._rows)]
+
+def generate_course(seed, length=settings.COURSE_LENGTH, name=None):
+    if length < 1:
+        raise ValueError(f"percurso precisa de pelo menos 1 obstáculo (length={length})")
+    rng = random.Random(seed)
+    rows = [draw_obstacle(rng) for _ in range(length)]
+    is_flying, is_double, offsets, altitudes = zip(*rows)
+    return Course(name or f"seed-{seed}", seed, is_flying, is_double, offsets, altitudes)
+
+def save_library(courses, path=settings.COURSE_LIBRARY_FILE):
+    # todos os percursos concatenados num .npz; starts marca onde cada um começa
+    lengths = [len(course) for course in courses]
+    arrays = {
+        "names": np.array([course.name for course in courses], dtype=str),
+        "seeds": np.array([-1 if course.seed is None else course.seed for course in courses], dtype=np.int64),
+        "starts": np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        "is_flying": np.concatenate([course.is_flying for course in courses]) if courses else np.zeros(0, dtype=bool),
+        "is_double": np.concatenate([course.is_double for course in courses]) if courses else np.zeros(0, dtype=bool),
+        "offsets": np.concatenate([course.offsets for course in courses]) if courses else np.zeros(0, dtype=np.int16),
+        "altitudes": np.concatenate([course.altitudes for course in courses]) if courses else np.zeros(0, dtype=np.int16),
+    }
+    f, tmp_path = checkpoint.atomic_open(path, 'wb')
+    np.savez_compressed(f, **arrays)
+    checkpoint.atomic_commit(f, tmp_path, path)
+
+def load_library(path=settings.COURSE_LIBRARY_FILE):
+    # {nome: Course}, na ordem em que foram salvos
+    courses = {}
+    with np.load(path) as data:
+        starts = data["starts"]
+        for i, name in enumerate(data["names"].tolist()):
+            rows = slice(starts[i], starts[i + 1])
+            seed = int(data["seeds"][i])
+            courses[name] = Course(name, None if seed < 0 else seed, data["is_flying"][rows], data["is_double"][rows], data["offsets"][rows], data["altitudes"][rows])
+    return courses
+
+def load_course(name, path=settings.COURSE_LIBRARY_FILE):
+    courses = load_library(path)
+    if name not in courses:
+        raise KeyError(f"percurso '{name}' não está em {path} (disponíveis: {', '.join(courses) or 'nenhum'})")
+    return courses[name]
+
+def default_course():
+    # percurso do settings.COURSE_NAME, ou None pra sortear ao vivo
+    if settings.COURSE_NAME is None:
+        return None
+    return load_course(settings.COURSE_NAME)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera ou lista a biblioteca de percursos do Dino")
+    parser.add_argument("--seeds", type=int, nargs="*", default=[], help="uma seed por percurso novo")
+    parser.add_argument("--length", type=int, default=settings.COURSE_LENGTH, help="obstáculos por percurso")
+    parser.add_argument("--file", default=settings.COURSE_LIBRARY_FILE, help="arquivo da biblioteca")
+    args = parser.parse_args()
+
+    # percursos novos entram na biblioteca existente (mesmo nome substitui)
+    courses = load_library(args.file) if os.path.exists(args.file) else {}
+    for seed in args.seeds:
+        course = generate_course(seed, args.length)
+        courses[course.name] = course
+    if args.seeds:
+        save_library(list(courses.values()), args.file)
+
+    for course in courses.values():
+        print(f"{course.name}: seed {course.seed}, {len(course)} obstáculos ({int(course.is_flying.sum())} voadores, {int(course.is_double.sum())} duplos)")
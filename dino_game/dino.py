@@ -1,17 +1,24 @@
 import pygame
 import settings
-import math
+import sensors
+import render
+from sim_clock import SimClock
 
 class Dino(pygame.sprite.Sprite):
 
-    def __init__(self, x:int, y:int, width:int=settings.DINO_WIDTH, height:int=settings.DINO_HEIGHT, alpha = 255, dino_id = 0):
+    def __init__(self, x:int, y:int, width:int=settings.DINO_WIDTH, height:int=settings.DINO_HEIGHT, alpha = 255, dino_id = 0, headless = False, sim_clock = None):
         super().__init__()
 
         #APARENCIA 
+        # headless: sem Surface, apenas o rect para física/colisão
+        self.headless = headless
         self.color = settings.COLOR_DINO.copy()
         self.color.append(alpha) #adiciona transparencia
-        self.image = pygame.Surface([width, height], pygame.SRCALPHA)
-        self.image.fill(self.color)
+        if headless:
+            self.image = None
+        else:
+            # imagens das poses vêm do atlas, compartilhadas entre dinossauros da mesma cor
+            self.image = render.solid_surface(width, height, self.color, per_pixel_alpha=True)
         self.height = settings.DINO_HEIGHT
         self.crouch_height = settings.DINO_CROUCH_HEIGHT
         self.width = width
@@ -25,7 +32,7 @@ class Dino(pygame.sprite.Sprite):
         self.last_action = None
 
         #Posição
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect(0, 0, width, height)
         self.rect.x = x
         self.rect.y = y
         self.rect.bottom = settings.GROUND_LEVEL #inicia no chao
@@ -41,66 +48,21 @@ class Dino(pygame.sprite.Sprite):
         self._initial_y = settings.GROUND_LEVEL
 
         self.raycount = settings.RAYCOUNT
-        self.rays = []
-        self.init_rays()
+        self.observation = sensors.Observation(self.raycount) #reaproveitada a cada cast_rays
 
-        self.min_crouch_duration = getattr(settings, 'DINO_MIN_CROUCH_DURATION', 300) 
+        # relógio do mundo (ticks); sem mundo, o dino tem um próprio
+        self.sim_clock = sim_clock if sim_clock is not None else SimClock()
+        self.min_crouch_ticks = settings.DINO_MIN_CROUCH_TICKS
         self.time_crouch_started = 0 
         self.stand_request_pending = False # Novo: para pedido de levantar pendente
 
 
-    def init_rays(self):
-        self.rays = []
-        for _ in range(self.raycount):
-            self.rays.append({
-                'start': (0,0),
-                'end': (0,0),
-                'hit': False,
-                'distance': float('inf'),
-                'obstacle_type': None
-            })
-        
-    def cast_rays(self, obstacles):
-        self.init_rays()
-        origin_x = self.rect.centerx
-        origin_y = self.rect.centery
-        
-        for i, angle in enumerate(settings.RAYS):
-            angle_rad = math.radians(angle)
-            end_x = origin_x + settings.RAY_LENGTH * math.cos(angle_rad)
-            end_y = origin_y + settings.RAY_LENGTH * math.sin(angle_rad)
-            closest_hit_dist = settings.RAY_LENGTH
-            hit_type = None
-            for obstacle in obstacles:
-                clipped_segment_points = obstacle.rect.clipline(
-                    (origin_x, origin_y), (end_x, end_y)
-                )
-                if clipped_segment_points:
-                    intersect_x, intersect_y = clipped_segment_points[0]
-                    dist_to_intersection = math.hypot(intersect_x - origin_x, intersect_y - origin_y)
-                    if dist_to_intersection < closest_hit_dist:
-                        closest_hit_dist = dist_to_intersection
-                        hit_type = 'flying' if obstacle.is_flying else 'ground'
-            if hit_type is not None: 
-                self.rays[i]['hit'] = True
-                self.rays[i]['distance'] = closest_hit_dist
-                self.rays[i]['obstacle_type'] = hit_type
-        closest_ground = float('inf')
-        closest_flying = float('inf')
-        for ray in self.rays:
-            if ray['hit']:
-                if ray['obstacle_type'] == 'ground' and ray['distance'] < closest_ground:
-                    closest_ground = ray['distance']
-                elif ray['obstacle_type'] == 'flying' and ray['distance'] < closest_flying:
-                    closest_flying = ray['distance']
-        if closest_ground <= 0.0: closest_ground = 0.0
-        if closest_flying <= 0.0: closest_flying = 0.0
-        return {
-            'ground_detected': closest_ground < float('inf'),
-            'flying_detected': closest_flying < float('inf'),
-            'ground_distance': closest_ground,
-            'flying_distance': closest_flying
-        }
+    def cast_rays(self, boxes, box_types):
+        # mesmo sensor em lote do treino, com um dinossauro só (blocos do World.boxes_in_range)
+        distances, hit_types = sensors.cast_rays_batch([self.rect.centerx], [self.rect.centery], boxes, box_types)
+        ground, flying = sensors.nearest_distances(distances, hit_types)
+        self.observation.fill(distances[0], hit_types[0], ground[0], flying[0])
+        return self.observation
 
     def jump(self):
         if self.on_ground and not self.is_crouching: 
@@ -112,27 +74,25 @@ class Dino(pygame.sprite.Sprite):
         return False
     
     def stand_visuals(self):
-        self.image = pygame.Surface([self.width, self.height], pygame.SRCALPHA)
-        self.image.fill(self.color)
-        bottom = self.rect.bottom
-        current_x = self.rect.x 
-        self.rect = self.image.get_rect()
-        self.rect.x = current_x
-        self.rect.bottom = bottom
+        self.resize(self.height)
 
     def crouch_visuals(self):
-        self.image = pygame.Surface([self.width, self.crouch_height], pygame.SRCALPHA)
-        self.image.fill(self.color)
+        self.resize(self.crouch_height)
+
+    def resize(self, height):
+        # troca a altura mantendo x e o "pé" no mesmo lugar
+        if not self.headless:
+            self.image = render.solid_surface(self.width, height, self.color, per_pixel_alpha=True)
         bottom = self.rect.bottom
         current_x = self.rect.x 
-        self.rect = self.image.get_rect()
-        self.rect.x = current_x 
+        self.rect = pygame.Rect(0, 0, self.width, height)
+        self.rect.x = current_x
         self.rect.bottom = bottom
 
     def crouch(self):
         if self.on_ground and not self.is_crouching and not self.is_jumping:
             self.is_crouching = True
-            self.time_crouch_started = pygame.time.get_ticks() 
+            self.time_crouch_started = self.sim_clock.tick
             self.stand_request_pending = False # Novo comando de agachar cancela pedido de levantar
             self.crouch_visuals()
             return True
@@ -143,7 +103,7 @@ class Dino(pygame.sprite.Sprite):
             self.stand_request_pending = False 
             return False
 
-        can_stand_immediately = (pygame.time.get_ticks() - self.time_crouch_started) > self.min_crouch_duration
+        can_stand_immediately = self.sim_clock.elapsed(self.time_crouch_started) > self.min_crouch_ticks
         
         if can_stand_immediately:
             self.is_crouching = False
@@ -161,7 +121,7 @@ class Dino(pygame.sprite.Sprite):
 
             # Verifica se deve levantar automaticamente (pedido pendente e cooldown expirado)
             if self.is_crouching and self.stand_request_pending:
-                if (pygame.time.get_ticks() - self.time_crouch_started) > self.min_crouch_duration:
+                if self.sim_clock.elapsed(self.time_crouch_started) > self.min_crouch_ticks:
                     self.is_crouching = False
                     self.stand_request_pending = False 
                     self.stand_visuals()
@@ -181,7 +141,7 @@ class Dino(pygame.sprite.Sprite):
                 self.on_ground = False
             
     def draw(self, surface:pygame.Surface):
-        surface.blit(self.image, self.rect)
+        return surface.blit(self.image, self.rect)
 
     def reset(self):
         self.rect.x = self._initial_x 
@@ -199,6 +159,7 @@ class Dino(pygame.sprite.Sprite):
         self.last_action = None
         self.time_crouch_started = 0 
         self.stand_request_pending = False
+        self.observation.clear()
 
 
     def die(self):
@@ -208,7 +169,8 @@ class Dino(pygame.sprite.Sprite):
 if __name__ == '__main__':
     pygame.init()
     screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
-    dino = Dino(x=100, y=settings.GROUND_LEVEL) 
+    sim_clock = SimClock()
+    dino = Dino(x=100, y=settings.GROUND_LEVEL, sim_clock=sim_clock) 
     clock = pygame.time.Clock()
     running = True
     
@@ -230,6 +192,7 @@ if __name__ == '__main__':
                     key_down_pressed = False
                     dino.stand() # Tenta levantar; se não puder, o pedido é registrado
         
+        sim_clock.advance()
         dino.update() # O update agora pode fazer o dino levantar se o pedido estiver pendente e o cooldown expirou
 
         screen.fill(settings.COLOR_SKY) 
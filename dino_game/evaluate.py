@@ -0,0 +1,55 @@
+import numpy as np
+import argparse
+import json
+import pygame
+import settings
+from base_game import BaseAIGame
+from course import load_library
+from vec_env import DinoVecEnv
+
+# Avaliação da Q-table nos percursos da biblioteca: política gulosa (sem exploração),
+# um ambiente por percurso, todos em lote. Os obstáculos são sempre os mesmos, então os
+# números são comparáveis entre políticas e entre builds.
+def evaluate(q_table, courses, max_steps=settings.EVALUATION_MAX_STEPS):
+    env = DinoVecEnv(len(courses), courses=courses, max_episode_steps=max_steps)
+    observations = env.reset()
+    results = [None] * len(courses)
+    pending = len(courses)
+    while pending:
+        actions = np.argmax(q_table.array[observations], axis=1)
+        observations, _, dones, info = env.step(actions)
+        # só o primeiro episódio de cada ambiente conta (depois ele reseta sozinho)
+        for j, i in enumerate(np.flatnonzero(dones)):
+            if results[i] is None:
+                results[i] = {
+                    "course": courses[i].name,
+                    "score": int(info["episode_steps"][j]),
+                    "return": float(info["episode_returns"][j]),
+                    "completed": bool(info["truncated"][i]), #chegou no max_steps sem colidir
+                }
+                pending -= 1
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Avalia a Q-table salva nos percursos da biblioteca")
+    parser.add_argument("--file", default=settings.COURSE_LIBRARY_FILE, help="biblioteca de percursos (course.py)")
+    parser.add_argument("--courses", nargs="*", default=None, help="nomes dos percursos (padrão: todos)")
+    parser.add_argument("--max-steps", type=int, default=settings.EVALUATION_MAX_STEPS, help="limite de steps por percurso")
+    parser.add_argument("--output", default=None, help="salva os resultados em JSON")
+    args = parser.parse_args()
+
+    library = load_library(args.file)
+    names = args.courses or list(library)
+    courses = [library[name] for name in names]
+
+    q_table = BaseAIGame(None, q_table_mmap_mode='c').q_table
+    results = evaluate(q_table, courses, args.max_steps)
+    for result in results:
+        print(f"{result['course']}: score {result['score']}{' (limite)' if result['completed'] else ''} | retorno {result['return']:.1f}")
+    print(f"média: {np.mean([result['score'] for result in results]):.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    pygame.quit()
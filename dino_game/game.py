@@ -4,9 +4,9 @@ from dino import Dino
 from base_game import BaseGame
 
 class Game(BaseGame):
-    def __init__(self, screen: pygame.Surface):
-        super().__init__(screen)
-        self.dino = Dino(x=50, y=settings.GROUND_LEVEL+60)
+    def __init__(self, screen: pygame.Surface, course=None):
+        super().__init__(screen, course=course)
+        self.dino = Dino(x=50, y=settings.GROUND_LEVEL+60, sim_clock=self.sim_clock)
         self.sprites.add(self.dino)
     
     def handle_input(self):
@@ -48,9 +48,7 @@ class Game(BaseGame):
         super().draw_game()
 
         if self.game_over:
-            restart_text = self.small_font.render("'R' - Restart | ESC - Menu", True, (200,200,200))
-            restart_rect = restart_text.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 + 50))
-            self.screen.blit(restart_text, restart_rect)
+            self.text_cache.blit(self.screen, self.small_font, "'R' - Restart | ESC - Menu", (200,200,200), center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 + 50))
 
     def reset_game(self):
         super().reset_game()
@@ -0,0 +1,85 @@
+import threading
+import queue
+import json
+import csv
+import os
+import numpy as np
+
+# Métricas do treino (uma linha por geração) em JSONL ou CSV, gravadas numa thread.
+# A fila é limitada: se o disco travar, log() descarta a linha (e conta) em vez de parar o treino.
+class MetricsWriter:
+    def __init__(self, path, max_queue=1024, flush_every=16):
+        self.path = path
+        self.format = "csv" if path.endswith(".csv") else "jsonl"
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.flush_every = flush_every
+        self.dropped = 0
+        self.written = 0
+        # abre já aqui: um caminho inválido falha na hora, não numa thread que morre calada
+        # acrescenta ao arquivo; no CSV o cabeçalho só é escrito em arquivo novo
+        self.new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', newline='')
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self.thread.start()
+
+    def log(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        f = self.file
+        writer = None
+        pending = 0
+        try:
+            while True:
+                record = self.queue.get()
+                if record is None:
+                    break
+                if self.format == "csv":
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(record.keys()), extrasaction='ignore')
+                        if self.new_file:
+                            writer.writeheader()
+                    writer.writerow(record)
+                else:
+                    f.write(json.dumps(record) + "\n")
+                self.written += 1
+                pending += 1
+                # grava em lotes, ou quando a fila esvazia
+                if pending >= self.flush_every or self.queue.empty():
+                    f.flush()
+                    pending = 0
+        except OSError as e:
+            # disco cheio, arquivo removido...: o close() avisa; log() segue descartando sem travar
+            self.error = e
+        finally:
+            try:
+                f.close()
+            except OSError:
+                pass
+
+    def close(self):
+        # espera o que já está na fila ser gravado; se a thread morreu, ninguém mais esvazia a fila
+        while self.thread.is_alive():
+            try:
+                self.queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self.thread.join()
+        if self.error is not None:
+            print(f"[métricas] erro gravando {self.path}: {self.error}")
+        if self.dropped:
+            print(f"[métricas] {self.dropped} linhas descartadas (fila cheia)")
+
+def fitness_stats(fitness):
+    if len(fitness) == 0:
+        return {"best_fitness": 0, "mean_fitness": 0.0, "median_fitness": 0.0}
+    return {
+        "best_fitness": int(np.max(fitness)),
+        "mean_fitness": float(np.mean(fitness)),
+        "median_fitness": float(np.median(fitness)),
+    }
@@ -0,0 +1,194 @@
+import numpy as np
+import math
+import settings
+import sensors
+
+def draw_obstacle(rng):
+    # sorteia (voador, duplo, deslocamento em x, altitude) do próximo obstáculo
+    # a ordem dos sorteios é fixa: um percurso gerado com a seed S (course.py) tem os mesmos
+    # obstáculos de um mundo ao vivo com a seed S
+    is_flying = rng.randint(0, 1) == 1
+    is_double = False
+    if is_flying and rng.randint(0, 1) == 1:
+        is_double = True
+    offset = rng.randint(50, 200)
+    altitude = rng.choice(settings.FLYING_OBSTACLE_ALTITUDE) if is_flying else 0
+    return is_flying, is_double, offset, altitude
+
+# Obstáculos de um mundo como linhas de arrays de capacidade fixa: o spawn só reescreve uma linha,
+# sem criar Sprite, Rect ou Surface. Cada linha tem até dois blocos [left, top, right, bottom]
+# (o segundo é NaN nos obstáculos simples, e NaN nunca colide nem é atingido pelos raios).
+# Os obstáculos nascem sempre à direita e andam juntos, então a ordem de spawn quase sempre é a ordem
+# por x (a exceção, em velocidades extremas, fica marcada em behind): a fila é um anel guardado duas
+# vezes (slot e slot + capacidade), assim os ativos são sempre a fatia contínua [head, head + count)
+# e o sensor e a colisão recebem views, sem cópia.
+class ObstaclePool:
+    def __init__(self, capacity=settings.OBSTACLE_POOL_SIZE):
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        size = 2 * capacity
+        self.boxes = np.full((size, 2, 4), np.nan)
+        self.box_types = np.full((size, 2), sensors.NO_HIT, dtype=np.int8)
+        self.widths = np.full((size, 2), np.nan)
+        self.is_flying = np.zeros(size, dtype=bool)
+        self.is_double = np.zeros(size, dtype=bool)
+        self.retired = np.zeros(size, dtype=bool) #saiu da tela fora de ordem (linha vazia até ser descartada)
+        self.behind = np.zeros(size, dtype=bool) #nasceu atrás de um obstáculo mais velho
+        # views das colunas x e rascunho do arredondamento, criados uma vez
+        self.lefts = self.boxes[:, :, 0]
+        self.box_rights = self.boxes[:, :, 2]
+        self.xs = self.boxes[:, :, 0::2] #left e right
+        self.scratch = np.empty((size, 2))
+        self.head = 0
+        self.count = 0
+        self.unordered = 0 #linhas ativas com behind
+
+    def _grow(self):
+        # só acontece se a tela lotar além da capacidade (velocidades muito altas)
+        rows = slice(self.head, self.head + self.count)
+        old = (self.boxes[rows].copy(), self.box_types[rows].copy(), self.widths[rows].copy(),
+               self.is_flying[rows].copy(), self.is_double[rows].copy(), self.retired[rows].copy(), self.behind[rows].copy())
+        count = self.count
+        unordered = self.unordered
+        self._allocate(2 * self.capacity)
+        for start in (0, self.capacity):
+            rows = slice(start, start + count)
+            self.boxes[rows], self.box_types[rows], self.widths[rows], self.is_flying[rows], self.is_double[rows], self.retired[rows], self.behind[rows] = old
+        self.count = count
+        self.unordered = unordered
+
+    def spawn(self, rng):
+        return self.add(*draw_obstacle(rng))
+
+    def add(self, is_flying, is_double, offset, altitude):
+        # novo obstáculo na fila (sorteado pelo draw_obstacle ou lido de um percurso); devolve a linha
+        if is_flying:
+            width = settings.FLYING_OBSTACLE_WIDTH
+            height = settings.FLYING_OBSTACLE_HEIGHT
+        else:
+            width = settings.OBSTACLE_WIDTH
+            height = settings.OBSTACLE_HEIGHT
+        left = settings.SCREEN_WIDTH + offset # Spawn fora da tela, com uma variação
+        bottom = settings.GROUND_LEVEL - altitude
+        box_type = sensors.FLYING if is_flying else sensors.GROUND
+
+        if self.count == self.capacity:
+            self._grow()
+        # fora de ordem se nasceu atrás do obstáculo mais à direita: com tudo em ordem ele é o último da
+        # fila, senão procura entre os ativos (NaN das linhas vazias é ignorado; o head nunca é vazio)
+        behind = False
+        if self.count:
+            last = self.head + self.count - 1
+            front = self.boxes[last, 0, 0]
+            if self.unordered or math.isnan(front):
+                front = np.nanmax(self.lefts[self.head:last + 1, 0])
+            behind = bool(left < front)
+            self.unordered += behind
+        slot = (self.head + self.count) % self.capacity
+        for row in (slot, slot + self.capacity):
+            box = self.boxes[row]
+            box[0] = (left, bottom - height, left + width, bottom)
+            self.box_types[row, 0] = box_type
+            self.widths[row, 0] = width
+            if is_double:
+                bottom2 = settings.GROUND_LEVEL - (altitude + 60)
+                box[1] = (left + 20, bottom2 - height, left + 20 + width, bottom2)
+                self.box_types[row, 1] = box_type
+                self.widths[row, 1] = width
+            else:
+                box[1] = np.nan
+                self.box_types[row, 1] = sensors.NO_HIT
+                self.widths[row, 1] = np.nan
+            self.is_flying[row] = is_flying
+            self.is_double[row] = is_double
+            self.retired[row] = False
+            self.behind[row] = behind
+        self.count += 1
+        return self.head + self.count - 1
+
+    def update(self, speed):
+        # move todas as linhas (as livres também, não faz mal) arredondando como o Rect do pygame
+        # (.5 pra longe do zero). Os x são inteiros, então fora de um empate em .5 o arredondamento
+        # dá o mesmo deslocamento inteiro pra todos: uma soma só nas colunas x
+        whole = math.floor(speed)
+        fraction = speed - whole
+        box_rights = self.box_rights
+        if abs(fraction - 0.5) > 1e-9:
+            np.add(self.xs, whole + (fraction > 0.5), out=self.xs)
+        else:
+            lefts = self.lefts
+            scratch = self.scratch
+            np.add(lefts, speed, out=lefts)
+            np.copysign(0.5, lefts, out=scratch)
+            np.add(lefts, scratch, out=lefts)
+            np.trunc(lefts, out=lefts)
+            np.add(lefts, self.widths, out=box_rights)
+
+        # os que saíram da tela (bloco principal) quase sempre são os primeiros da fila
+        while self.count and (box_rights[self.head, 0] < 0 or self.retired[self.head]):
+            if self.behind[self.head] and not self.retired[self.head]:
+                self.unordered -= 1
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+        # com spawn a cada passo (velocidades altas) o x sorteado pode deixar um mais novo atrás de um
+        # mais velho: esse sai da tela fora de ordem e vira uma linha vazia até chegar a vez dele
+        for row in range(self.head + 1, self.head + self.count):
+            if box_rights[row, 0] < 0:
+                self._retire(row)
+
+    def _retire(self, row):
+        slot = row % self.capacity
+        if self.behind[slot]:
+            self.unordered -= 1
+        for mirror in (slot, slot + self.capacity):
+            self.boxes[mirror] = np.nan
+            self.widths[mirror] = np.nan
+            self.box_types[mirror] = sensors.NO_HIT
+            self.retired[mirror] = True
+
+    def active_rows(self):
+        # linhas dos obstáculos ativos, na ordem por x
+        for row in range(self.head, self.head + self.count):
+            if not self.retired[row]:
+                yield row
+
+    def rows_in_range(self, left, right):
+        # linhas [start, stop) com algum bloco entre left e right (x), sem olhar as que estão além de right
+        start = self.head
+        stop = self.head + self.count
+        box_rights = self.box_rights
+        # pula os que já passaram de left (os dois blocos; NaN do simples conta como passado)
+        while start < stop and box_rights[start, 0] < left and not box_rights[start, 1] >= left:
+            start += 1
+        lefts = self.lefts
+        if self.unordered:
+            # algum obstáculo nasceu atrás de um mais velho: os que estão além de right não encerram a
+            # busca, vai até o último que começa antes de right (os do meio não acertam nada a mais)
+            end = stop
+            while end > start and not lefts[end - 1, 0] <= right: #linhas vazias (NaN) também ficam de fora
+                end -= 1
+            return start, end
+        end = start
+        while end < stop and not lefts[end, 0] > right: #linhas vazias (NaN) não param a busca
+            end += 1
+        return start, end
+
+    def boxes_in_range(self, left, right):
+        # (K, 4) e (K,) prontos pro sensors.cast_rays_batch e Population.check_collisions
+        start, end = self.rows_in_range(left, right)
+        return self.boxes[start:end].reshape(-1, 4), self.box_types[start:end].reshape(-1)
+
+    def collides(self, rect):
+        # como Rect.colliderect contra os blocos perto do rect
+        boxes, _ = self.boxes_in_range(rect.left, rect.right)
+        return bool((
+            (rect.left < boxes[:, 2]) & (rect.right > boxes[:, 0]) &
+            (rect.top < boxes[:, 3]) & (rect.bottom > boxes[:, 1])
+        ).any())
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.unordered = 0
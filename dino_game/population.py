@@ -0,0 +1,128 @@
+import numpy as np
+import settings
+
+# Física da população em struct-of-arrays: mesmas regras do Dino.update/jump/crouch/stand,
+# mas aplicadas a todos os dinossauros de uma vez com operações do NumPy
+class Population:
+    def __init__(self, size:int, x:int = 50, width:int = settings.DINO_WIDTH, height:int = settings.DINO_HEIGHT, crouch_height:int = settings.DINO_CROUCH_HEIGHT):
+        self.size = size
+        self.x = x
+        self.width = width
+        self.stand_height = height
+        self.crouch_height = crouch_height
+        self.min_crouch_ticks = settings.DINO_MIN_CROUCH_TICKS
+
+        #Posição (rect.bottom e altura atual; o x é o mesmo pra todos)
+        self.bottom = np.full(size, settings.GROUND_LEVEL, dtype=np.int64)
+        self.height = np.full(size, height, dtype=np.int64)
+
+        #Movimentação
+        self.velocity_y = np.zeros(size, dtype=np.float64)
+        self.on_ground = np.ones(size, dtype=bool)
+        self.is_jumping = np.zeros(size, dtype=bool)
+        self.is_crouching = np.zeros(size, dtype=bool)
+        self.stand_request_pending = np.zeros(size, dtype=bool)
+        self.time_crouch_started = np.zeros(size, dtype=np.int64)
+
+        #Para população
+        self.alive = np.ones(size, dtype=bool)
+        self.fitness = np.zeros(size, dtype=np.int64)
+
+    @property
+    def top(self):
+        return self.bottom - self.height
+
+    @property
+    def centerx(self):
+        return self.x + self.width // 2
+
+    @property
+    def centery(self):
+        return self.top + self.height // 2
+
+    def reset(self, mask=None):
+        # mask None reseta todos; senão só os selecionados (ex.: ambientes que terminaram)
+        if mask is None:
+            mask = slice(None)
+        self.bottom[mask] = settings.GROUND_LEVEL
+        self.height[mask] = self.stand_height
+        self.velocity_y[mask] = 0
+        self.on_ground[mask] = True
+        self.is_jumping[mask] = False
+        self.is_crouching[mask] = False
+        self.stand_request_pending[mask] = False
+        self.time_crouch_started[mask] = 0
+        self.alive[mask] = True
+        self.fitness[mask] = 0
+
+    def _stand(self, mask):
+        self.is_crouching[mask] = False
+        self.stand_request_pending[mask] = False
+        self.height[mask] = self.stand_height
+
+    def apply_actions(self, actions, now):
+        # equivalente vetorizado do BaseAIGame.perform_action, só para os vivos
+        # now = tick atual do SimClock do mundo (escalar, ou um por dinossauro se cada um tem seu mundo)
+        # 0 = nada/ 1 = pulo/ 2 = agachar/ 3 = levantar
+        actions = np.asarray(actions)
+        now = np.broadcast_to(np.asarray(now, dtype=np.int64), (self.size,))
+        alive = self.alive
+
+        # levantar (ação 3, ou ação 1 agachado): respeita o cooldown do agachamento
+        wants_stand = alive & self.is_crouching & ((actions == 1) | (actions == 3))
+        can_stand = (now - self.time_crouch_started) > self.min_crouch_ticks
+        self._stand(wants_stand & can_stand)
+        self.stand_request_pending[wants_stand & ~can_stand] = True
+
+        # pulo: quem continua agachado (cooldown ativo) não pula
+        jumped = alive & (actions == 1) & self.on_ground & ~self.is_crouching
+        self.velocity_y[jumped] = -settings.JUMP_FORCE
+        self.is_jumping[jumped] = True
+        self.on_ground[jumped] = False
+        self.stand_request_pending[jumped] = False
+
+        # agachar
+        crouched = alive & (actions == 2) & self.on_ground & ~self.is_crouching & ~self.is_jumping
+        self.is_crouching[crouched] = True
+        self.time_crouch_started[crouched] = now[crouched]
+        self.stand_request_pending[crouched] = False
+        self.height[crouched] = self.crouch_height
+
+    def update(self, now):
+        alive = self.alive
+        self.fitness[alive] += 1
+
+        # levanta automaticamente se tinha pedido pendente e o cooldown expirou
+        expired = (now - self.time_crouch_started) > self.min_crouch_ticks
+        self._stand(alive & self.is_crouching & self.stand_request_pending & expired)
+
+        # Movimentação vertical (pulo e gravidade)
+        airborne = alive & ~self.on_ground
+        self.velocity_y[airborne] += settings.GRAVITY
+        self.bottom[alive] += np.trunc(self.velocity_y[alive]).astype(np.int64)
+
+        landed = alive & (self.bottom >= settings.GROUND_LEVEL)
+        self.bottom[landed] = settings.GROUND_LEVEL
+        self.velocity_y[landed] = 0
+        self.is_jumping[landed] = False
+        self.on_ground[landed] = True
+        self.on_ground[alive & ~landed] = False
+
+    def check_collisions(self, boxes):
+        # colisão de todos os dinossauros contra boxes [left, top, right, bottom], como Rect.colliderect
+        # boxes (K, 4) compartilhado, ou (N, K, 4) um conjunto por dinossauro (linhas NaN nunca colidem)
+        boxes = np.asarray(boxes, dtype=np.float64)
+        if boxes.ndim == 2 or boxes.size == 0:
+            boxes = boxes.reshape(1, -1, 4)
+        left = self.x
+        right = self.x + self.width
+        top = self.top[:, None]
+        bottom = self.bottom[:, None]
+        overlap = (
+            (left < boxes[:, :, 2]) & (right > boxes[:, :, 0]) &
+            (top < boxes[:, :, 3]) & (bottom > boxes[:, :, 1])
+        )
+        return overlap.any(axis=1)
+
+    def kill(self, mask):
+        self.alive[mask] = False
@@ -0,0 +1,45 @@
+import time
+import csv
+
+# tempo por fase do passo de treino, somado por episódio
+# uso: begin() no início de um trecho, mark('fase') no fim de cada fase (a próxima começa ali)
+class PhaseTimer:
+    def __init__(self, phases):
+        self.phases = list(phases)
+        self.index = {phase: i for i, phase in enumerate(self.phases)}
+        self.totals = [0.0] * len(self.phases) #segundos no episódio atual
+        self.steps = 0
+        self.last = time.perf_counter()
+        self.history = [] #uma linha por episódio: (episódio, steps, totais)
+
+    def begin(self):
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.totals[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_step(self):
+        self.steps += 1
+
+    def end_episode(self, episode):
+        self.history.append((episode, self.steps, self.totals))
+        self.totals = [0.0] * len(self.phases)
+        self.steps = 0
+
+    def last_episode_per_step(self):
+        # {fase: microssegundos por step} do último episódio fechado
+        if not self.history:
+            return None
+        _, steps, totals = self.history[-1]
+        steps = max(steps, 1)
+        return {phase: 1e6 * total / steps for phase, total in zip(self.phases, totals)}
+
+    def to_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["episode", "steps"] + [f"{phase}_ms" for phase in self.phases] + [f"{phase}_us_per_step" for phase in self.phases])
+            for episode, steps, totals in self.history:
+                per_step = [1e6 * total / max(steps, 1) for total in totals]
+                writer.writerow([episode, steps] + [f"{1e3 * total:.3f}" for total in totals] + [f"{value:.2f}" for value in per_step])
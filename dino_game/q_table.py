@@ -0,0 +1,337 @@
+import numpy as np
+import bisect
+import settings
+
+#0 = nada/ 1 = pulo/ 2 = agachar/ 3 = levantar
+N_ACTIONS = 4
+
+# dimensões do estado de BaseAIGame.get_state:
+# (distância terrestre, distância voador, agachado, velocidade y, velocidade do jogo)
+STATE_DIMS = (
+    settings.DISTANCE_BINS,
+    settings.DISTANCE_BINS,
+    2,
+    len(settings.VELOCITY_BINS) - 1,
+    len(settings.GAME_SPEED_BINS) - 1,
+)
+N_STATES = int(np.prod(STATE_DIMS))
+
+DISTANCE_BIN_EDGES = np.linspace(0, settings.RAY_LENGTH, settings.DISTANCE_BINS + 1)
+
+# Discretizador pré-calculado (mesmo resultado do np.digitize com as bordas internas):
+# distância -> LUT inteira em 0..RAY_LENGTH; como as bordas não são inteiras, cada célula [n, n+1)
+# guarda também a borda que cai dentro dela (ou inf) e o bin sobe 1 se a distância passar dela
+_inner_distance_edges = DISTANCE_BIN_EDGES[1:-1]
+_lut_cells = np.arange(settings.RAY_LENGTH + 1)
+DISTANCE_LUT = np.searchsorted(_inner_distance_edges, _lut_cells, side='right').astype(np.int64)
+DISTANCE_CELL_EDGE = np.full(settings.RAY_LENGTH + 1, np.inf)
+for _edge in _inner_distance_edges:
+    if _edge != int(_edge):
+        DISTANCE_CELL_EDGE[int(_edge)] = _edge
+# listas Python para o caminho escalar (um dinossauro): sem overhead de chamada numpy
+_distance_lut = DISTANCE_LUT.tolist()
+_distance_cell_edge = DISTANCE_CELL_EDGE.tolist()
+
+# velocidades: limiares internos já ordenados (bisect/searchsorted com side='right' = np.digitize)
+VELOCITY_THRESHOLDS = np.array(settings.VELOCITY_BINS[1:-1], dtype=np.float64)
+GAME_SPEED_THRESHOLDS = np.array(settings.GAME_SPEED_BINS[1:-1], dtype=np.float64)
+_velocity_thresholds = VELOCITY_THRESHOLDS.tolist()
+_game_speed_thresholds = GAME_SPEED_THRESHOLDS.tolist()
+
+# peso de cada componente no id (mixed radix, mesma ordem do np.ravel_multi_index)
+STATE_STRIDES = tuple(int(np.prod(STATE_DIMS[i + 1:])) for i in range(len(STATE_DIMS)))
+
+def distance_bin(distance):
+    if distance >= settings.RAY_LENGTH:
+        return _distance_lut[-1]
+    if distance <= 0:
+        return 0
+    cell = int(distance)
+    return _distance_lut[cell] + (distance >= _distance_cell_edge[cell])
+
+def velocity_bin(velocity_y):
+    return bisect.bisect_right(_velocity_thresholds, velocity_y)
+
+def game_speed_bin(game_speed):
+    return bisect.bisect_right(_game_speed_thresholds, game_speed)
+
+def discretize_state(ground_dist, flying_dist, is_crouching, velocity_y, game_speed):
+    # estado (tupla de bins) de um dinossauro
+    return (
+        distance_bin(ground_dist),
+        distance_bin(flying_dist),
+        1 if is_crouching else 0,
+        velocity_bin(velocity_y),
+        game_speed_bin(game_speed),
+    )
+
+def distance_bins(distances):
+    distances = np.clip(distances, 0, settings.RAY_LENGTH)
+    cells = distances.astype(np.int64)
+    return DISTANCE_LUT[cells] + (distances >= DISTANCE_CELL_EDGE[cells])
+
+def discretize_states(ground_dist, flying_dist, is_crouching, velocity_y, game_speed):
+    # versão em lote do discretize_state: arrays (N,) -> bins (N, 5)
+    # game_speed pode ser um escalar (mundo compartilhado) ou um array (um mundo por dinossauro)
+    ground_dist = np.asarray(ground_dist, dtype=np.float64)
+    states = np.empty((len(ground_dist), 5), dtype=np.int64)
+    states[:, 0] = distance_bins(ground_dist)
+    states[:, 1] = distance_bins(np.asarray(flying_dist, dtype=np.float64))
+    states[:, 2] = np.asarray(is_crouching, dtype=np.int64)
+    states[:, 3] = np.searchsorted(VELOCITY_THRESHOLDS, velocity_y, side='right')
+    states[:, 4] = np.searchsorted(GAME_SPEED_THRESHOLDS, game_speed, side='right')
+    return states
+
+def encode_observations(ground_dist, flying_dist, is_crouching, velocity_y, game_speed):
+    # features cruas de uma população -> ids dos estados (N,), sem passar pela matriz de bins
+    ground_stride, flying_stride, crouch_stride, velocity_stride, _ = STATE_STRIDES
+    state_ids = distance_bins(np.asarray(ground_dist, dtype=np.float64)) * ground_stride
+    state_ids += distance_bins(np.asarray(flying_dist, dtype=np.float64)) * flying_stride
+    state_ids += np.asarray(is_crouching, dtype=np.int64) * crouch_stride
+    state_ids += np.searchsorted(VELOCITY_THRESHOLDS, velocity_y, side='right') * velocity_stride
+    if np.ndim(game_speed) == 0:
+        state_ids += game_speed_bin(float(game_speed))
+    else:
+        state_ids += np.searchsorted(GAME_SPEED_THRESHOLDS, game_speed, side='right')
+    return state_ids
+
+def encode_observation(ground_dist, flying_dist, is_crouching, velocity_y, game_speed):
+    # id do estado de um dinossauro
+    return encode_state(discretize_state(ground_dist, flying_dist, is_crouching, velocity_y, game_speed))
+
+def encode_state(state_tuple):
+    # tupla de bins -> id inteiro (mixed radix, mesma ordem do np.ravel_multi_index)
+    state_id = 0
+    for value, dim in zip(state_tuple, STATE_DIMS):
+        state_id = state_id * dim + int(value)
+    return state_id
+
+def encode_states(states):
+    # (N, 5) -> (N,) ids
+    states = np.asarray(states, dtype=np.int64)
+    return np.ravel_multi_index(states.T, STATE_DIMS)
+
+def decode_state(state_id):
+    return tuple(int(v) for v in np.unravel_index(int(state_id), STATE_DIMS))
+
+class QTable:
+    # Q-table densa: ndarray float32 (N_STATES, N_ACTIONS) indexado pelo id do estado.
+    # Mantém a interface de dict (chaves = tuplas de estado, valores = linha com os 4 Q-values)
+    # para o código que usa q_table.get / q_table[state] / items()
+    def __init__(self, array=None, visited=None):
+        self.array = np.zeros((N_STATES, N_ACTIONS), dtype=np.float32) if array is None else array
+        # estados que "existem" na tabela (equivalente às chaves do dict antigo)
+        self.visited = np.zeros(N_STATES, dtype=bool) if visited is None else visited
+        # linhas alteradas desde o último checkpoint (para os deltas)
+        self.dirty = np.zeros(N_STATES, dtype=bool)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.visited))
+
+    def __bool__(self):
+        return bool(self.visited.any())
+
+    def __contains__(self, state_tuple):
+        return bool(self.visited[encode_state(state_tuple)])
+
+    def __getitem__(self, state_tuple):
+        state_id = encode_state(state_tuple)
+        if not self.visited[state_id]:
+            raise KeyError(state_tuple)
+        return self.array[state_id]
+
+    def __setitem__(self, state_tuple, q_values):
+        state_id = encode_state(state_tuple)
+        self.array[state_id] = q_values
+        self.visited[state_id] = True
+        self.dirty[state_id] = True
+
+    def get(self, state_tuple, default=None):
+        state_id = encode_state(state_tuple)
+        if not self.visited[state_id]:
+            return default
+        return self.array[state_id]
+
+    def keys(self):
+        return [decode_state(state_id) for state_id in np.flatnonzero(self.visited)]
+
+    def items(self):
+        for state_id in np.flatnonzero(self.visited):
+            yield decode_state(state_id), self.array[state_id]
+
+    def copy(self):
+        return QTable(self.array.copy(), self.visited.copy())
+
+    def copy_from(self, other):
+        np.copyto(self.array, other.array)
+        np.copyto(self.visited, other.visited)
+        self.dirty.fill(True)
+
+    def clear(self):
+        self.array.fill(0)
+        self.visited.fill(False)
+        self.dirty.fill(True)
+
+    def mark_dirty(self, state_ids):
+        self.dirty[state_ids] = True
+
+    def take_dirty(self):
+        # ids das linhas alteradas desde a última chamada
+        state_ids = np.flatnonzero(self.dirty)
+        self.dirty.fill(False)
+        return state_ids
+
+    def update(self, state_id, action, reward, next_state_id, alpha, gamma):
+        # Q-learning direto no array, sem alocar listas
+        # next_state_id None = estado terminal (max_future_q = 0)
+        self.visited[state_id] = True
+        self.dirty[state_id] = True
+        max_future_q = 0.0
+        if next_state_id is not None:
+            self.visited[next_state_id] = True
+            self.dirty[next_state_id] = True
+            max_future_q = self.array[next_state_id].max()
+        old_q_value = self.array[state_id, action]
+        self.array[state_id, action] = old_q_value + alpha * (reward + gamma * max_future_q - old_q_value)
+
+class PopulationQTable:
+    # Q-tables de uma população com copy-on-write por linha:
+    # todos os dinossauros leem a tabela do pai (base) e só ganham uma linha privada
+    # quando atualizam aquele estado. Trocar de geração custa o número de linhas tocadas,
+    # e a memória também é só das linhas tocadas, não população x tamanho da tabela.
+    # o índice tem pelo menos INDEX_SPREAD posições por linha privada: a busca em lote espera a
+    # maior sequência de colisões do lote, e com 1/4 de ocupação ela fica curta
+    INDEX_SPREAD = 4
+
+    def __init__(self, size, base: QTable, initial_capacity = 1024):
+        self.size = size
+        self.base = base
+        self.rows = np.zeros((initial_capacity, N_ACTIONS), dtype=np.float32)
+        # dono de cada linha privada, para desfazer o índice sem varrê-lo
+        self.row_dino = np.zeros(initial_capacity, dtype=np.int32)
+        self.row_state = np.zeros(initial_capacity, dtype=np.int32)
+        self.row_position = np.zeros(initial_capacity, dtype=np.intp) #posição da linha no índice
+        self.row_count = 0
+        self._allocate_index(self.INDEX_SPREAD * initial_capacity)
+
+    def _allocate_index(self, capacity):
+        # índice esparso (dino, estado) -> linha privada: tabela hash com endereçamento aberto
+        # (sondagem linear) sobre a chave dino * N_STATES + estado; capacidade em potência de 2
+        capacity = 1 << (capacity - 1).bit_length()
+        self.index_shift = np.uint64(64 - (capacity.bit_length() - 1))
+        self.index_keys = np.full(capacity, -1, dtype=np.int64) #-1 = vazio
+        self.index_slots = np.zeros(capacity, dtype=np.int32)
+
+    def _keys(self, dinos, state_ids):
+        keys = np.asarray(dinos, dtype=np.int64) * N_STATES
+        keys += state_ids
+        return keys
+
+    def _find(self, keys):
+        # posição de cada chave no índice, ou do vazio onde ela entraria, e a chave que está lá
+        # quase sempre resolve na primeira posição; só as colisões seguem sondando
+        positions = self._hash(keys)
+        found = self.index_keys[positions]
+        pending = np.flatnonzero((found != keys) & (found >= 0))
+        mask = len(self.index_keys) - 1
+        while len(pending):
+            positions[pending] = (positions[pending] + 1) & mask
+            found[pending] = self.index_keys[positions[pending]]
+            pending = pending[(found[pending] != keys[pending]) & (found[pending] >= 0)]
+        return positions, found
+
+    def _hash(self, keys):
+        # hash multiplicativo (Fibonacci): os bits altos do produto viram a posição
+        hashed = keys.view(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        hashed >>= self.index_shift
+        return hashed.astype(np.intp, copy=False)
+
+    def _insert(self, keys, slots):
+        # chaves novas e únicas; quando duas caem no mesmo vazio uma fica e a outra sonda de novo
+        while len(keys):
+            positions, _ = self._find(keys)
+            self.index_keys[positions] = keys
+            placed = self.index_keys[positions] == keys
+            self.index_slots[positions[placed]] = slots[placed]
+            self.row_position[slots[placed]] = positions[placed]
+            keys = keys[~placed]
+            slots = slots[~placed]
+
+    def _slots(self, dinos, state_ids):
+        # índice da linha privada de cada par, -1 = lê da base
+        keys = self._keys(dinos, state_ids)
+        positions, found = self._find(keys)
+        return np.where(found == keys, self.index_slots[positions], -1)
+
+    def _grow(self, needed):
+        capacity = len(self.rows)
+        while capacity < needed:
+            capacity *= 2
+        if capacity != len(self.rows):
+            self.rows = np.resize(self.rows, (capacity, N_ACTIONS))
+            self.row_dino = np.resize(self.row_dino, capacity)
+            self.row_state = np.resize(self.row_state, capacity)
+            self.row_position = np.resize(self.row_position, capacity)
+        if self.INDEX_SPREAD * needed > len(self.index_keys):
+            # índice cheio: refaz com o dobro e reinsere as linhas atuais
+            capacity = len(self.index_keys)
+            while self.INDEX_SPREAD * needed > capacity:
+                capacity *= 2
+            self._allocate_index(capacity)
+            count = self.row_count
+            self._insert(self._keys(self.row_dino[:count], self.row_state[:count]), np.arange(count, dtype=np.int32))
+
+    def lookup(self, dinos, state_ids):
+        # (k, N_ACTIONS) Q-values de cada par (dinossauro, estado)
+        slots = self._slots(dinos, state_ids)
+        q_values = self.base.array[state_ids]
+        private = slots >= 0
+        q_values[private] = self.rows[slots[private]]
+        return q_values
+
+    def materialize(self, dinos, state_ids):
+        # garante uma linha privada para cada par (copiada da base); os pares devem ser únicos
+        slots = self._slots(dinos, state_ids)
+        missing = slots < 0
+        count = int(np.count_nonzero(missing))
+        if count:
+            self._grow(self.row_count + count)
+            new_slots = np.arange(self.row_count, self.row_count + count, dtype=np.int32)
+            new_dinos = dinos[missing]
+            new_states = state_ids[missing]
+            self.rows[new_slots] = self.base.array[new_states]
+            self.row_dino[new_slots] = new_dinos
+            self.row_state[new_slots] = new_states
+            self._insert(self._keys(new_dinos, new_states), new_slots)
+            slots[missing] = new_slots
+            self.row_count += count
+        return slots
+
+    def set_values(self, dinos, state_ids, actions, values):
+        slots = self.materialize(dinos, state_ids)
+        self.rows[slots, actions] = values
+
+    def touched_states(self, dino):
+        mask = self.row_dino[:self.row_count] == dino
+        return self.row_state[:self.row_count][mask], self.rows[:self.row_count][mask]
+
+    def table(self, dino):
+        # tabela completa de um dinossauro (cópia), para inspeção/exportação
+        table = self.base.copy()
+        states, rows = self.touched_states(dino)
+        table.array[states] = rows
+        table.visited[states] = True
+        return table
+
+    def promote(self, dino):
+        # o dinossauro vira o pai da próxima geração: suas linhas privadas vão para a base
+        states, rows = self.touched_states(dino)
+        self.base.array[states] = rows
+        self.base.visited[states] = True
+        self.base.mark_dirty(states)
+        return len(states)
+
+    def reset(self):
+        # todos voltam a ler da base, esvaziando só as posições usadas do índice
+        self.index_keys[self.row_position[:self.row_count]] = -1
+        self.row_count = 0
@@ -0,0 +1,105 @@
+import pygame
+import settings
+from collections import OrderedDict
+
+# fontes carregadas uma vez só, por (nome, tamanho)
+_fonts = {}
+
+def get_font(size, name=None):
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.Font(name, size)
+        _fonts[key] = font
+    return font
+
+# atlas de Surfaces de cor sólida (poses do dino, obstáculos, overlays), por (tamanho, cor, alpha)
+# as Surfaces são compartilhadas por todas as instâncias: só leitura, não desenhe nelas
+_surfaces = {}
+
+def solid_surface(width, height, color, per_pixel_alpha=False):
+    key = (width, height, tuple(color), per_pixel_alpha)
+    surface = _surfaces.get(key)
+    if surface is None:
+        if per_pixel_alpha:
+            surface = pygame.Surface([width, height], pygame.SRCALPHA)
+        else:
+            surface = pygame.Surface([width, height])
+        surface.fill(color)
+        _surfaces[key] = surface
+    return surface
+
+def background_surface(width, height):
+    # céu + chão desenhados uma vez
+    key = ('background', width, height)
+    surface = _surfaces.get(key)
+    if surface is None:
+        surface = pygame.Surface([width, height])
+        surface.fill(settings.COLOR_SKY)
+        pygame.draw.rect(surface, settings.COLOR_GROUND, pygame.Rect(0, settings.GROUND_LEVEL, width, height - settings.GROUND_LEVEL))
+        _surfaces[key] = surface
+    return surface
+
+class DirtyRenderer:
+    # redesenha só as áreas sujas: apaga os rects do frame anterior com o fundo em cache,
+    # junta os rects desenhados no frame atual e apresenta tudo com display.update(rects)
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self.previous = [] #rects desenhados no frame anterior
+        self.current = []
+        self.full = True #próximo frame redesenha e apresenta a tela inteira
+
+    def invalidate(self):
+        self.full = True
+
+    def erase(self):
+        if self.full:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous:
+                self.screen.blit(self.background, rect, rect)
+
+    def mark(self, rect):
+        if rect:
+            self.current.append(rect)
+
+    def present(self):
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+        self.current = []
+        self.full = False
+
+class TextCache:
+    # cache LRU das Surfaces de texto, por (fonte, texto, cor)
+    # texto que não mudou custa só o blit
+    def __init__(self, max_entries=256, antialias=True):
+        self.max_entries = max_entries
+        self.antialias = antialias
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, self.antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False) #descarta o usado há mais tempo
+        return surface
+
+    def blit(self, screen, font, text, color, pos=None, **rect_kwargs):
+        # desenha o texto em pos ou alinhado pelo rect (ex.: center=(x, y)); devolve o rect
+        surface = self.render(font, text, color)
+        rect = surface.get_rect(**rect_kwargs) if pos is None else surface.get_rect(topleft=pos)
+        screen.blit(surface, rect)
+        return rect
+
+    def clear(self):
+        self.surfaces.clear()
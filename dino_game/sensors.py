@@ -0,0 +1,147 @@
+import numpy as np
+import math
+import settings
+
+# tipos de obstáculo nos arrays do sensor
+NO_HIT = -1
+GROUND = 0
+FLYING = 1
+
+# direção de cada raio (settings.RAYS), calculada uma vez
+_angles = np.radians(np.array(settings.RAYS, dtype=np.float64))
+RAY_DIR_X = np.cos(_angles)
+RAY_DIR_Y = np.sin(_angles)
+
+# raios paralelos a um eixo (0 e -90 graus) são tratados à parte no slab test
+_EPS = 1e-9
+_PARALLEL_X = np.abs(RAY_DIR_X) < _EPS
+_PARALLEL_Y = np.abs(RAY_DIR_Y) < _EPS
+_INV_DIR_X = 1.0 / np.where(_PARALLEL_X, 1.0, RAY_DIR_X)
+_INV_DIR_Y = 1.0 / np.where(_PARALLEL_Y, 1.0, RAY_DIR_Y)
+
+# quanto os raios alcançam para trás/para frente em x, por unidade de comprimento
+_RAY_REACH_BACK = min(0.0, float(RAY_DIR_X.min()))
+_RAY_REACH_FORWARD = max(0.0, float(RAY_DIR_X.max()))
+
+def ray_x_window(origin_x, ray_length = settings.RAY_LENGTH):
+    # faixa de x que algum raio pode tocar; obstáculos fora dela não precisam ser testados
+    return origin_x + _RAY_REACH_BACK * ray_length - 1, origin_x + _RAY_REACH_FORWARD * ray_length + 1
+
+def stack_boxes(per_group):
+    # um conjunto (boxes (K, 4), tipos (K,)) por dinossauro (mundos diferentes): (N, K, 4) com NaN nas linhas vazias
+    max_boxes = max((len(types) for _, types in per_group), default=0)
+    boxes = np.full((len(per_group), max_boxes, 4), np.nan)
+    types = np.full((len(per_group), max_boxes), NO_HIT, dtype=np.int8)
+    for i, (group_boxes, group_types) in enumerate(per_group):
+        boxes[i, :len(group_types)] = group_boxes
+        types[i, :len(group_types)] = group_types
+    return boxes, types
+
+def _slab(low, high, origin, inv_dir, parallel):
+    # intervalo [near, far] de t em que o raio está entre low e high num eixo
+    t1 = (low - origin) * inv_dir
+    t2 = (high - origin) * inv_dir
+    near = np.minimum(t1, t2)
+    far = np.maximum(t1, t2)
+    # raio paralelo ao eixo: ou está sempre dentro da faixa, ou nunca
+    inside = (origin >= low) & (origin <= high)
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), near)
+    far = np.where(parallel, np.inf, far)
+    return near, far
+
+def cast_rays_batch(origin_x, origin_y, boxes, box_types, ray_length = settings.RAY_LENGTH):
+    # Raycast de todos os dinossauros contra todos os obstáculos de uma vez (slab test raio x AABB)
+    # origin_x, origin_y: (N,)
+    # boxes: (K, 4) compartilhado por todos, ou (N, K, 4) um conjunto por dinossauro (linhas NaN são ignoradas)
+    # box_types: (K,) ou (N, K)
+    # retorna distances (N, R) com inf onde não acertou e hit_types (N, R) com NO_HIT/GROUND/FLYING
+    origin_x = np.asarray(origin_x, dtype=np.float64)
+    origin_y = np.asarray(origin_y, dtype=np.float64)
+    n = origin_x.shape[0]
+    raycount = RAY_DIR_X.shape[0]
+    boxes = np.asarray(boxes, dtype=np.float64)
+    box_types = np.asarray(box_types)
+
+    distances = np.full((n, raycount), np.inf)
+    hit_types = np.full((n, raycount), NO_HIT, dtype=np.int8)
+    if n == 0 or boxes.shape[-2] == 0:
+        return distances, hit_types
+
+    if boxes.ndim == 2:
+        boxes = boxes[None]
+        box_types = box_types[None]
+
+    # eixos: (N, R, K). Como no Rect.clipline, right/bottom são exclusivos
+    left = boxes[:, None, :, 0]
+    top = boxes[:, None, :, 1]
+    right = boxes[:, None, :, 2] - 1
+    bottom = boxes[:, None, :, 3] - 1
+    ox = origin_x[:, None, None]
+    oy = origin_y[:, None, None]
+    inv_dx = _INV_DIR_X[None, :, None]
+    inv_dy = _INV_DIR_Y[None, :, None]
+
+    # t em unidades de comprimento do raio (direção unitária)
+    tx_near, tx_far = _slab(left, right, ox, inv_dx, _PARALLEL_X[None, :, None])
+    ty_near, ty_far = _slab(top, bottom, oy, inv_dy, _PARALLEL_Y[None, :, None])
+    t_enter = np.maximum(tx_near, ty_near)
+    t_exit = np.minimum(tx_far, ty_far)
+
+    hit = (t_enter <= t_exit) & (t_exit >= 0)
+    dist = np.where(hit, np.maximum(t_enter, 0.0), np.inf)
+
+    closest = np.argmin(dist, axis=2)
+    closest_dist = np.take_along_axis(dist, closest[..., None], axis=2)[..., 0]
+    hit_any = closest_dist < ray_length
+
+    # tipo do obstáculo mais próximo de cada raio
+    closest_types = np.take_along_axis(np.broadcast_to(box_types[:, None, :], dist.shape), closest[..., None], axis=2)[..., 0]
+
+    distances[hit_any] = closest_dist[hit_any]
+    hit_types[hit_any] = closest_types[hit_any]
+    return distances, hit_types
+
+def nearest_distances(distances, hit_types):
+    # menor distância até um obstáculo terrestre e até um voador, por dinossauro (inf se nenhum)
+    ground = np.where(hit_types == GROUND, distances, np.inf).min(axis=1)
+    flying = np.where(hit_types == FLYING, distances, np.inf).min(axis=1)
+    return ground, flying
+
+class Observation:
+    # leitura do sensor de um dinossauro: raios + obstáculo mais próximo de cada tipo
+    # preenchida uma vez por cast e lida pelo estado, pela escolha da ação e pelo painel
+    __slots__ = ('distances', 'hit_types', 'ground_distance', 'flying_distance')
+
+    def __init__(self, raycount = settings.RAYCOUNT):
+        self.distances = np.full(raycount, np.inf)
+        self.hit_types = np.full(raycount, NO_HIT, dtype=np.int8)
+        self.ground_distance = math.inf
+        self.flying_distance = math.inf
+
+    def fill(self, distances, hit_types, ground_distance, flying_distance):
+        np.copyto(self.distances, distances)
+        np.copyto(self.hit_types, hit_types)
+        self.ground_distance = float(ground_distance)
+        self.flying_distance = float(flying_distance)
+
+    def clear(self):
+        self.distances.fill(np.inf)
+        self.hit_types.fill(NO_HIT)
+        self.ground_distance = math.inf
+        self.flying_distance = math.inf
+
+    @property
+    def ground_detected(self):
+        return self.ground_distance < math.inf
+
+    @property
+    def flying_detected(self):
+        return self.flying_distance < math.inf
+
+def ray_end(origin, angle_index, distance):
+    # ponto final de um raio (para desenhar)
+    angle = math.radians(settings.RAYS[angle_index])
+    return (
+        int(origin[0] + distance * math.cos(angle)),
+        int(origin[1] + distance * math.sin(angle))
+    )
@@ -1,6 +1,10 @@
 #GAME SETTINGS
 FPS = 60
 TRAININGFPS = 60
+TRAINING_RENDER_FPS = 30 #frames desenhados por segundo no treino, independente da velocidade da simulação
+TRAINING_SIM_BUDGET = 0.8 #fração do frame que a simulação pode usar no modo adaptativo
+TRAINING_INPUT_POLL = 0.05 #s, intervalo máximo entre leituras de input enquanto simula
+TIMING_CSV_FILE = "dino_timing.csv" #tempos por fase do treino (tecla T)
 GRAVITY = 3
 SPEED_INCREASE = 0.0002
 
@@ -8,6 +12,7 @@ SPEED_INCREASE = 0.0002
 SCREEN_HEIGHT = 600
 SCREEN_WIDTH = 1000
 GROUND_LEVEL = SCREEN_HEIGHT - 50
+DIRTY_RECT_RENDERING = True #Game/Watch/Versus redesenham e apresentam só as áreas que mudaram
 
 #COLORS
 COLOR_SKY = [0, 90, 255] #[135, 206, 235]
@@ -25,7 +30,8 @@ DINO_HEIGHT = 60
 DINO_WIDTH = 40
 JUMP_FORCE = 40
 DINO_CROUCH_HEIGHT = 30
-DINO_MIN_CROUCH_DURATION = 200
+DINO_MIN_CROUCH_DURATION = 200 #ms, a FPS
+DINO_MIN_CROUCH_TICKS = round(DINO_MIN_CROUCH_DURATION * FPS / 1000) #cooldown em ticks da simulação
 
 #OBSTACLE SETTINGS
 OBSTACLE_HEIGHT = 50
@@ -33,6 +39,11 @@ OBSTACLE_WIDTH = 30
 OBSTACLE_SPEED = -5
 SPAWN_INTERVAL = 100
 SPAWN_INTERVAL_SPEED_EFFECT = 1
+OBSTACLE_POOL_SIZE = 32 #linhas reservadas por mundo (cresce sozinho se a tela lotar)
+COURSE_LIBRARY_FILE = "dino_courses.npz" #percursos pré-gerados (course.py)
+COURSE_NAME = None #percurso da biblioteca usado por todos os modos (None = obstáculos sorteados ao vivo)
+COURSE_LENGTH = 5000 #obstáculos por percurso gerado
+EVALUATION_MAX_STEPS = 20000 #limite de steps por percurso na avaliação (evaluate.py)
 FLYING_OBSTACLE_HEIGHT = 40
 FLYING_OBSTACLE_WIDTH = 50
 FLYING_OBSTACLE_ALTITUDE = [50, 50+60]
@@ -44,6 +55,12 @@ GAMMA = 0.99
 EPSILON_INIT = 1.0
 EPSILON_DECAY = 0.995
 EPSILON_MIN = 0.01
+Q_TABLE_FILE = "dino_q_table.bin" #checkpoint binário
+Q_TABLE_JSON_FILE = "dino_q_table.json" #formato antigo, importação/exportação
+Q_TABLE_DELTA_FILE = "dino_q_table.delta" #log append-only das linhas alteradas desde o último checkpoint completo
+CHECKPOINT_EVERY = 1 #episódios entre checkpoints (salvos em segundo plano, só as linhas alteradas)
+CHECKPOINT_COMPACT_EVERY = 50 #deltas até juntar tudo num checkpoint completo
+METRICS_FILE = "dino_metrics.jsonl" #métricas por geração (.jsonl ou .csv)
 #EXPLORATION_JUMP_PROB = 0.05
 #EXPLORATION_CROUCH_PROB = 0.3
 
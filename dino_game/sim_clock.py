@@ -0,0 +1,14 @@
+# Relógio da simulação: conta ticks (passos simulados), não milissegundos.
+# Cooldowns medidos em ticks não mudam quando o treino é acelerado ou roda headless.
+class SimClock:
+    def __init__(self):
+        self.tick = 0
+
+    def advance(self):
+        self.tick += 1
+
+    def reset(self):
+        self.tick = 0
+
+    def elapsed(self, since):
+        return self.tick - since
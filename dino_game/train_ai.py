@@ -1,16 +1,45 @@
 import pygame
 import settings
-from dino import Dino
-from obstacle import Obstacle
 from base_game import BaseAIGame
-import random
-import math
+from population import Population
+from q_table import PopulationQTable, N_ACTIONS
+import sensors
 import numpy as np
+import checkpoint
+import render
+from profiler import PhaseTimer
+from metrics import MetricsWriter, fitness_stats
+import time
+
+# modos de desenho do treino (tecla M alterna):
+# adaptive = o slider define steps/s e o K de cada frame sai do tempo passado
+# fixed = K steps por frame (setas cima/baixo mudam o K)
+# generation = simula sem desenhar e mostra um frame no fim de cada geração
+RENDER_MODES = ['adaptive', 'fixed', 'generation']
+MAX_STEPS_PER_FRAME = 4096
+
+# fases do passo de treino medidas pelo PhaseTimer
+TIMING_PHASES = ['observe', 'world', 'learn', 'generation', 'draw', 'tick']
+
+def read_training_config():
+    # lê os parâmetros de uma Q-table salva, ou None se ela não existir
+    data = checkpoint.read_training_data()
+    if data is None:
+        return None
+    # Extrai os parâmetros
+    training_params = data.get("training_params", {})
+    config = {}
+    config['ALPHA'] = training_params.get("alpha", settings.ALPHA)
+    config['GAMMA'] = training_params.get("gamma", settings.GAMMA)
+    config['EPSILON_INIT'] = data.get("epsilon", settings.EPSILON_INIT)
+    config['EPSILON_DECAY'] = training_params.get("epsilon_decay", settings.EPSILON_DECAY)
+    config['EPSILON_MIN'] = training_params.get("epsilon_min", settings.EPSILON_MIN)
+    config['POPULATION_SIZE'] = training_params.get("population_size", settings.POPULATION_SIZE)
+    return config
 
 class Train(BaseAIGame):
-    def __init__(self, screen: pygame.Surface, custom_config=None):
-        super().__init__(screen)
-        self.last_spawn = pygame.time.get_ticks()
+    def __init__(self, screen: pygame.Surface, custom_config=None, seed=None, q_table=None, course=None):
+        super().__init__(screen, seed=seed, q_table=q_table, course=course)
         self.custom_config = custom_config
 
         # Slider de velocidade
@@ -20,11 +49,25 @@ class Train(BaseAIGame):
         self.slider_dragging = False
         self.training_fps = settings.TRAININGFPS
 
+        # simulação desacoplada do desenho: K steps por frame
+        self.render_mode = 'adaptive'
+        self.steps_per_frame = 1 #K do modo fixo
+        self.last_frame_steps = 0 #K do último frame, pro painel
+        self.last_input_poll = 0.0
+
+        # tempo por fase, somado por episódio
+        self.timer = PhaseTimer(TIMING_PHASES)
+
+        # métricas por geração (open_metrics liga a gravação)
+        self.metrics = None
+        self.generation_steps = 0
+        self.generation_start = time.perf_counter()
+        self.states_touched = 0
+
         #População
         if custom_config: self.population_size = custom_config['POPULATION_SIZE']
         else: self.population_size = settings.POPULATION_SIZE
 
-        self.dinos = pygame.sprite.Group()
         self.active_dino_count = 0
         self.best_dino = None
         self.best_fitness = 0
@@ -35,101 +78,122 @@ class Train(BaseAIGame):
         self.q_val_crouch = 0.0
         self.q_val_stand = 0.0
 
-        #Detecção de obstáculos visualização
-        self.obstacle_detection = {
-            'ground_detected': False,
-            'flying_detected': False,
-            'ground_distance': float('inf'),
-            'flying_distance': float('inf')
-        }
-
-        for i in range(self.population_size):
+        #Detecção de obstáculos visualização (observação do dinossauro mostrado no painel)
+        self.observation = sensors.Observation()
+
+        # a física de todos os dinossauros roda em arrays (Population)
+        self.population = Population(self.population_size, x = 50)
+
+        # cada dinossauro tem sua q_table e seu histórico (s, a)
+        # as tabelas compartilham a self.q_table (copy-on-write por linha) desde a primeira geração
+        self.q_tables = PopulationQTable(self.population_size, self.q_table)
+        self.last_states = np.full(self.population_size, -1, dtype=np.int64) # -1 = sem estado anterior
+        self.last_actions = np.full(self.population_size, -1, dtype=np.int64)
+        # s' de cada sobrevivente, reaproveitado como s do próximo passo (nada se move entre os dois)
+        self.next_states = np.full(self.population_size, -1, dtype=np.int64)
+        self.next_states_valid = False #falso depois de um reset: o primeiro passo observa de novo
+        self.rng = np.random.default_rng(seed) # exploração
+
+        # alpha e gamma do treino
+        self.train_alpha = self.custom_config.get('ALPHA', settings.ALPHA) if self.custom_config else settings.ALPHA
+        self.train_gamma = self.custom_config.get('GAMMA', settings.GAMMA) if self.custom_config else settings.GAMMA
+
+        # leituras do sensor em lote (N, RAYCOUNT)
+        self.ray_distances = np.full((self.population_size, settings.RAYCOUNT), np.inf)
+        self.ray_hit_types = np.full((self.population_size, settings.RAYCOUNT), sensors.NO_HIT, dtype=np.int8)
+        # obstáculo mais próximo de cada tipo, calculado uma vez por sense
+        self.ground_distances = np.full(self.population_size, np.inf)
+        self.flying_distances = np.full(self.population_size, np.inf)
+
+        # imagens em pé/agachado compartilhadas por todos os dinossauros
+        if not self.headless:
+            self.info_font = render.get_font(20) #fonte do painel
+            # os raios cobrem boa parte da tela: o treino desenha frames inteiros sobre o fundo em cache
+            self.renderer = None
             alpha = 70 #semi transparente
-            dino = Dino(x = 50, y = settings.GROUND_LEVEL + 60, alpha = alpha, dino_id = i)
-            self.dinos.add(dino)
-            self.sprites.add(dino)
+            dino_color = settings.COLOR_DINO + [alpha]
+            self.dino_images = {}
+            for height in (settings.DINO_HEIGHT, settings.DINO_CROUCH_HEIGHT):
+                self.dino_images[height] = render.solid_surface(settings.DINO_WIDTH, height, dino_color, per_pixel_alpha=True)
 
-        self.dino = list(self.dinos)[0]
         self.active_dino_count = self.population_size
 
         self.episodes_this_session = 0
 
-    def detect_obstacles(self, dino):
-        ground_obstacle_detected = False
-        flying_obstacle_detected = False
-        closest_ground_obstacle_distance = float('inf')
-        closest_flying_obstacle_distance = float('inf')
-
-        for i, ray in enumerate(dino.rays):
-            if ray['hit']:
-
-                if ray['obstacle_type'] == 'ground':
-                    ground_obstacle_detected = True
-                    if ray['distance'] < closest_ground_obstacle_distance:
-                        closest_ground_obstacle_distance = ray['distance']
-                elif ray['obstacle_type'] == 'flying':
-                    flying_obstacle_detected = True
-                    if ray['distance'] < closest_flying_obstacle_distance:
-                        closest_flying_obstacle_distance = ray['distance']
-        return {
-            'ground_detected':ground_obstacle_detected,
-            'flying_detected':flying_obstacle_detected,
-            'ground_distance':closest_ground_obstacle_distance,
-            'flying_distance':closest_flying_obstacle_distance,
-        }
+    def sense(self, indices):
+        # raycast em lote pros dinossauros em indices; devolve o id do estado de cada um
+        population = self.population
+        # todos os dinossauros estão no mesmo x: uma consulta só ao índice de obstáculos
+        boxes, box_types = self.world.boxes_in_range(*sensors.ray_x_window(population.centerx))
+        distances, hit_types = sensors.cast_rays_batch(
+            np.full(len(indices), population.centerx), population.centery[indices], boxes, box_types
+        )
+        self.ray_distances[indices] = distances
+        self.ray_hit_types[indices] = hit_types
+
+        ground_dist, flying_dist = sensors.nearest_distances(distances, hit_types)
+        self.ground_distances[indices] = ground_dist
+        self.flying_distances[indices] = flying_dist
+        return self.get_state_ids(ground_dist, flying_dist, population.is_crouching[indices], population.velocity_y[indices])
+
+    def detect_obstacles(self, index):
+        # observação do dinossauro index, sem varrer os raios de novo
+        self.observation.fill(self.ray_distances[index], self.ray_hit_types[index], self.ground_distances[index], self.flying_distances[index])
+        return self.observation
+
+    def update_hud(self, index, state_id):
+        # painel mostra o primeiro dinossauro vivo
+        self.detect_obstacles(index)
+
+        q_values = self.q_tables.lookup(np.array([index]), np.array([state_id]))[0]
+        self.q_val_no_action = float(q_values[0])
+        self.q_val_jump = float(q_values[1])
+        self.q_val_crouch = float(q_values[2])
+        self.q_val_stand = float(q_values[3])
     
-    def choose_action(self, state_tuple, dino=None):
-        if dino is None:
-            dino = self.dino
-
-        #pegar a informação dos obstaculos ao redor
-        obstacle_info = self.detect_obstacles(dino)
-
-        self.obstacle_detection = obstacle_info 
-
-        #pega os q_value pra esse estado
+    def choose_actions(self, indices, state_ids):
+        #pega os q_value pra esse estado de cada dinossauro
         #0 = nada/ 1 = pulo/ 2 = agachar/ 3 = levantar
-        default_q_list = [0.0, 0.0, 0.0, 0.0]
-        q_values = list(dino.q_table.get(state_tuple, default_q_list))
-
-
-        self.q_val_no_action = q_values[0]
-        self.q_val_jump = q_values[1]
-        self.q_val_crouch = q_values[2]
-        self.q_val_stand = q_values[3]  
+        q_values = self.q_tables.lookup(indices, state_ids)
+        actions = np.argmax(q_values, axis=1)
 
         #exploração
-        if random.uniform(0, 1) < self.epsilon:
-            rand_val = random.choice([0,1,2,3])
-            return rand_val
+        explore = self.rng.random(len(indices)) < self.epsilon
+        actions[explore] = self.rng.integers(0, N_ACTIONS, int(explore.sum()))
 
         # É possivel guiar o aprendizado, dando sugestões para uma fase inicial de treinamento (epsilon acima de um determinado valor)
         # Não forçar a escolha, mas sugerir ela
-        return np.argmax(q_values)
+        return actions
                 
             
     def select_best_dinosaur(self):
         best_fitness = 0
         best_dino = None
 
-        for dino in self.dinos:
-            if dino.fitness > best_fitness:
-                best_fitness = dino.fitness
-                best_dino = dino
+        best_index = int(np.argmax(self.population.fitness))
+        if self.population.fitness[best_index] > 0:
+            best_fitness = int(self.population.fitness[best_index])
+            best_dino = best_index
             
+        self.states_touched = 0
         if best_dino is not None:
             self.best_dino = best_dino
             self.best_fitness = best_fitness
-            if best_dino.q_table:
-                self.q_table = best_dino.q_table.copy()
+            # as linhas que o melhor atualizou passam para a self.q_table, base da próxima geração
+            self.states_touched = self.q_tables.promote(best_dino)
 
-            print(f"Episódio {self.current_episode}: Melhor dinossauro: {best_dino.id} com fitness {best_fitness}")
+            print(f"Episódio {self.current_episode}: Melhor dinossauro: {best_dino} com fitness {best_fitness}")
 
 
     def update_game_state(self):
 
+        timer = self.timer
+        timer.begin()
+
         if self.game_over:
+            finished_episode = self.current_episode
             self.select_best_dinosaur()
+            self.log_generation(finished_episode)
             self.reset_game()
 
             self.current_episode += 1
@@ -138,150 +202,156 @@ class Train(BaseAIGame):
             decay_rate = self.custom_config.get('EPSILON_DECAY', settings.EPSILON_DECAY) if self.custom_config else settings.EPSILON_DECAY
             self.epsilon = max(min_epsilon, self.epsilon * decay_rate)
 
-            if self.episodes_this_session > 0 and self.episodes_this_session % 50 == 0:
-                self.save_q_table()
+            if self.episodes_this_session > 0 and self.episodes_this_session % settings.CHECKPOINT_EVERY == 0:
+                self.save_q_table(background=True)
+            timer.mark('generation')
+            timer.end_episode(finished_episode)
             return # Encerra esse game. A próxima chamada vai criar a nova geração
 
-        #etapa 1: cada dinossauro vivo observa o estado do jogo
-        for dino in self.dinos:
-            if not dino.is_alive: #os mortos não fazem nada
-                continue
+        population = self.population
 
-            dino.cast_rays(self.obstacles)
-            observed_state_s = self.get_state(dino) #estado s pra decisão
+        #etapa 1: cada dinossauro vivo observa o estado do jogo (raycast em lote)
+        # o s' do passo anterior já é o estado atual dos sobreviventes, só observa de novo depois de um reset
+        alive_indices = np.flatnonzero(population.alive)
+        if self.next_states_valid:
+            observed_states = self.next_states[alive_indices] #estado s pra decisão
+        else:
+            observed_states = self.sense(alive_indices)
 
-            action_to_take = self.choose_action(observed_state_s, dino) #escolhe ação pro estado
+        actions = np.zeros(self.population_size, dtype=np.int64)
+        actions[alive_indices] = self.choose_actions(alive_indices, observed_states) #escolhe ação pro estado
 
-            cur_decision = observed_state_s # Usado para dino.last_state
-            cur_action = action_to_take   # Usado para dino.last_action
+        if not self.headless and len(alive_indices) > 0:
+            self.update_hud(alive_indices[0], observed_states[0])
 
-            # faz ação
-            self.perform_action(dino, action_to_take)
+        # faz as ações de todos de uma vez
+        population.apply_actions(actions, self.sim_clock.tick)
+        timer.mark('observe')
             
-        #etapa 2: atualiza o mundo
+        #etapa 2: atualiza o mundo (obstáculos) e a física da população
         super().update_game_state()
+        population.update(self.sim_clock.tick)
+        timer.mark('world')
 
         #fase 3: pra cada dinossauro, observar os resultado e aprender com os passos anteriores
-        new_active_dino_count = 0
-        default_q_list_terminal = [0.0, 0.0, 0.0, 0.0] # Para uso no update terminal
-        for dino in self.dinos:
-            if not dino.is_alive:
-                continue
-            
-            # estado s' é o estado apos o sprite update
-            dino.cast_rays(self.obstacles)
-            state_s_prime = self.get_state(dino)
-
-            speed_factor = min(1.0, abs(Obstacle.GLOBAL_SPEED) / 10)
-            # reward = 0.1 + (0.05 * speed_factor) # Recompensa base por sobreviver
-            current_reward = settings.BASE_SURVIVAL_REWARD + (settings.SPEED_FACTOR_REWARD * speed_factor)
-
-            #verifica colisao e aplica custos
-            collided_this_step = False
-            hit_obstacles_sprites = self.check_collisions(dino)
-
-            #se colidiu
-            if hit_obstacles_sprites:
-                current_reward = -settings.COLLISION_COST # Recompensa negativa por colisão
-                collided_this_step = True
-            else: #se nao colidiu
-                if dino.last_action == 1: # Custo do Pulo
-                    current_reward -= settings.JUMP_COST
-                elif dino.last_action == 2: # Custo de Agachar
-                    current_reward -= settings.CROUCH_COST
-
-            # Atualiza o q-learning com (dino.last_state, dino.last_action) como (s, a)
-            # state_s_prime é s', e current_reward_for_update é r.
-            if dino.last_state is not None and dino.last_action is not None:
-                if collided_this_step: # se colidiu (state_s_prime é terminal)
-                    # terminal update: Q(s,a) = Q(s,a) + alpha * (r - Q(s,a))
-                    # porque o max_future_q pra um estado terminal é 0
-                    
-                    current_q_values_list = list(dino.q_table.get(dino.last_state, default_q_list_terminal))
-                    current_q_values = current_q_values_list[:]
-
-                    old_q_value = current_q_values[dino.last_action]
-                    alpha = self.custom_config.get('ALPHA', settings.ALPHA) if self.custom_config else settings.ALPHA
-                    new_q_value = old_q_value + alpha * (current_reward - old_q_value)
-                    current_q_values[dino.last_action] = new_q_value
-                    dino.q_table[dino.last_state] = current_q_values
-                    
-                else: # state_s_prime não é terminal
-                    alpha = self.custom_config.get('ALPHA', settings.ALPHA) if self.custom_config else settings.ALPHA
-                    gamma = self.custom_config.get('GAMMA', settings.GAMMA) if self.custom_config else settings.GAMMA
-                    default_q_list = [0.0, 0.0, 0.0, 0.0]
-
-                    current_q_values_from_table = dino.q_table.get(dino.last_state, default_q_list)
-                    current_q_values = list(current_q_values_from_table)
-                    dino.q_table[dino.last_state] = current_q_values
-
-                    old_q_value = current_q_values[dino.last_action]
-                    
-                    next_q_values_from_table = dino.q_table.get(state_s_prime, default_q_list)
-                    next_q_values = list(next_q_values_from_table)
-                    dino.q_table[state_s_prime] = next_q_values 
-                    
-                    max_future_q = np.max(next_q_values)
-                    
-                    new_q_value = old_q_value + alpha * (current_reward + gamma * max_future_q - old_q_value)
-                    current_q_values[dino.last_action] = new_q_value
-                    dino.q_table[dino.last_state] = current_q_values
-
-            # Atualiza histórico do dinossauro
-            if collided_this_step:
-                dino.die()
-                dino.last_state = None
-                dino.last_action = None
-            else:
-                dino.last_state = cur_decision
-                dino.last_action = cur_action
-                new_active_dino_count += 1
+        # estado s' é o estado apos o update, e as colisões são checadas em lote
+        states_s_prime = self.sense(alive_indices)
+        boxes, _ = self.world.boxes_in_range(population.x, population.x + population.width)
+        collided = population.check_collisions(boxes)[alive_indices]
+
+        speed_factor = min(1.0, abs(self.world.speed) / 10)
+        # reward = 0.1 + (0.05 * speed_factor) # Recompensa base por sobreviver
+        rewards = np.full(len(alive_indices), settings.BASE_SURVIVAL_REWARD + (settings.SPEED_FACTOR_REWARD * speed_factor))
+
+        last_states = self.last_states[alive_indices]
+        last_actions = self.last_actions[alive_indices]
+
+        #se nao colidiu: custo do pulo / custo de agachar
+        rewards[last_actions == 1] -= settings.JUMP_COST
+        rewards[last_actions == 2] -= settings.CROUCH_COST
+        #se colidiu: recompensa negativa por colisão
+        rewards[collided] = -settings.COLLISION_COST
+
+        # Atualiza o q-learning com (last_state, last_action) como (s, a)
+        # states_s_prime é s', e rewards é r.
+        learn = last_states >= 0
+        dino_idx = alive_indices[learn]
+        s = last_states[learn]
+        a = last_actions[learn]
+        s_prime = states_s_prime[learn]
+        terminal = collided[learn]
+
+        # se colidiu, s' é terminal e o max_future_q é 0
+        # senão, max_future_q vem da tabela (lido antes de atualizar Q(s,a))
+        max_future_q = np.where(terminal, 0.0, self.q_tables.lookup(dino_idx, s_prime).max(axis=1))
+
+        # Q(s,a) é atualizado na linha privada: materializa uma vez e lê/escreve pelos mesmos slots
+        slots = self.q_tables.materialize(dino_idx, s)
+        old_q_values = self.q_tables.rows[slots, a]
+        new_q_values = old_q_values + self.train_alpha * (rewards[learn] + self.train_gamma * max_future_q - old_q_values)
+        self.q_tables.rows[slots, a] = new_q_values
+
+        # Atualiza histórico do dinossauro
+        dead = alive_indices[collided]
+        survivors = alive_indices[~collided]
+        population.kill(dead)
+        self.last_states[dead] = -1
+        self.last_actions[dead] = -1
+        self.last_states[survivors] = observed_states[~collided]
+        self.last_actions[survivors] = actions[survivors]
+        self.next_states[survivors] = states_s_prime[~collided]
+        self.next_states_valid = True
         
-        self.active_dino_count = new_active_dino_count
+        self.active_dino_count = len(survivors)
         if self.active_dino_count == 0:
             self.game_over = True
+        timer.mark('learn')
+        timer.end_step()
+        self.generation_steps += 1
     
     def reset_game(self):
         super().reset_game()
-        self.last_spawn = pygame.time.get_ticks()
 
         # Preparando a q-table base pros novos dinosssauros
-        # Ela é uma cópia da self.q_table que deve armazenar a q-table do melhor dino anterior ou de um arquivo carregado
-        base_q_table = {}
-        if self.q_table: 
-            # itera cada k e seus q-values
-            for state_key, q_value_list in self.q_table.items():
-                # e cria uma nova lista. necessário pois se usarmos .copy, as listas internas ainda apontarão para o mesmo objeto
-                base_q_table[state_key] = list(q_value_list)
-        
-        # reseta cada dinossauro e cria uma cópia da tabela Q base para cada dinossauro
-        for dino in self.dinos:
-            dino.reset()
-
-            new_dino_q_table = {}
-            for state_key, q_value_list in base_q_table.items():
-                new_dino_q_table[state_key] = list(q_value_list)
-
-            dino.q_table = new_dino_q_table
-
+        # A base é a self.q_table, que armazena a q-table do melhor dino anterior ou de um arquivo carregado
+        # os dinossauros só descartam as linhas privadas, sem copiar a tabela
+        self.population.reset()
+        self.ray_distances.fill(np.inf)
+        self.ray_hit_types.fill(sensors.NO_HIT)
+        self.ground_distances.fill(np.inf)
+        self.flying_distances.fill(np.inf)
+        self.observation.clear()
+        self.last_states.fill(-1)
+        self.last_actions.fill(-1)
+        self.next_states.fill(-1)
+        self.next_states_valid = False
+        self.q_tables.reset()
 
         self.active_dino_count = self.population_size
+        self.generation_steps = 0
+        self.generation_start = time.perf_counter()
+
+    def open_metrics(self, path=None):
+        self.metrics = MetricsWriter(path or settings.METRICS_FILE)
+
+    def close_metrics(self):
+        if self.metrics is not None:
+            self.metrics.close()
+            self.metrics = None
+
+    def log_generation(self, episode):
+        # uma linha por geração; não bloqueia (a gravação é numa thread)
+        if self.metrics is None:
+            return
+        elapsed = time.perf_counter() - self.generation_start
+        record = {"episode": int(episode), "steps": self.generation_steps}
+        record.update(fitness_stats(self.population.fitness))
+        record.update({
+            "epsilon": float(self.epsilon),
+            "q_table_size": len(self.q_table),
+            "states_touched": int(self.states_touched),
+            "rows_touched": int(self.q_tables.row_count),
+            "steps_per_sec": self.generation_steps / max(elapsed, 1e-9),
+            "checkpoint_latency_ms": 1e3 * self.checkpoint_writer.last_latency if self.checkpoint_writer else 0.0,
+            "time": time.time(),
+        })
+        self.metrics.log(record)
 
     def draw_info(self):
         super().draw_info() #score
         
-        small_font = pygame.font.Font(None, 20)
+        small_font = self.info_font
+        text = self.text_cache
 
         # desenha o slider de velocidade
         pygame.draw.rect(self.screen, settings.COLOR_BUTTON, self.slider_rect)
         pygame.draw.rect(self.screen, settings.COLOR_TEXT, self.slider_handle_rect)
-        speed_text = self.font.render(f"Speed: {self.speed_multiplier:.1f}x", True, settings.COLOR_TEXT)
-        self.screen.blit(speed_text, (120, 40))
+        text.blit(self.screen, self.font, f"Speed: {self.speed_multiplier:.1f}x", settings.COLOR_TEXT, (120, 40))
+        text.blit(self.screen, small_font, f"Render [M]: {self.render_mode} | {self.last_frame_steps} steps/frame", settings.COLOR_TEXT, (10, 65))
 
         #painel no lado direito
-        info_panel = pygame.Rect(settings.SCREEN_WIDTH - 200, 10, 190, 380)
-        info_surface = pygame.Surface((info_panel.width, info_panel.height), pygame.SRCALPHA) #superficie, draw rect nao suporta trasparência
-        info_surface.fill((0, 0, 0, 180))  # preto com transparencia
+        info_panel = pygame.Rect(settings.SCREEN_WIDTH - 200, 10, 190, 530)
+        info_surface = render.solid_surface(info_panel.width, info_panel.height, (0, 0, 0, 180), per_pixel_alpha=True) #superficie, draw rect nao suporta trasparência
         self.screen.blit(info_surface, info_panel)
         pygame.draw.rect(self.screen, (200, 200, 200), info_panel, 1) #borda
 
@@ -289,8 +359,7 @@ class Train(BaseAIGame):
         line_height = 20
 
         #titulo
-        title_text = small_font.render("Training info", True, settings.COLOR_TEXT)
-        self.screen.blit(title_text, (info_panel.x + 5, y_pos))
+        text.blit(self.screen, small_font, "Training info", settings.COLOR_TEXT, (info_panel.x + 5, y_pos))
         y_pos += line_height + 5
 
         stats = [
@@ -301,15 +370,13 @@ class Train(BaseAIGame):
         ]
 
         for stat in stats:
-            stat_text = small_font.render(stat, True, settings.COLOR_TEXT)
-            self.screen.blit(stat_text, (info_panel.x + 5, y_pos))
+            text.blit(self.screen, small_font, stat, settings.COLOR_TEXT, (info_panel.x + 5, y_pos))
             y_pos += line_height
         
 
         #Seção dos q-values (primeiro dino apenas)
         y_pos += 5 #pequeno espaçamento adicional
-        q_title = small_font.render("Q-values: ", True,settings.COLOR_TEXT)
-        self.screen.blit(q_title, (info_panel.x + 5, y_pos))
+        text.blit(self.screen, small_font, "Q-values: ", settings.COLOR_TEXT, (info_panel.x + 5, y_pos))
         y_pos += line_height
 
         q_values = [self.q_val_no_action, self.q_val_jump, self.q_val_crouch, self.q_val_stand]
@@ -326,8 +393,7 @@ class Train(BaseAIGame):
         for i, (q_val, label) in enumerate(zip(q_values, q_labels)):
             #label
             text_color = (255, 255, 0) if i == max_q_index else settings.COLOR_TEXT
-            q_text = small_font.render(f"{label}: {q_val:.2f}", True, text_color)
-            self.screen.blit(q_text, (info_panel.x + 5, y_pos))
+            text.blit(self.screen, small_font, f"{label}: {q_val:.2f}", text_color, (info_panel.x + 5, y_pos))
 
             # barra
             bar_width = abs(q_val) / max_q * bar_max_width
@@ -349,62 +415,65 @@ class Train(BaseAIGame):
         #seção de detecção de obstaculo
         y_pos += 5 
         #titulo
-        obs_title = small_font.render("Obstacles:", True, settings.COLOR_TEXT)
-        self.screen.blit(obs_title, (info_panel.x + 5, y_pos))
+        text.blit(self.screen, small_font, "Obstacles:", settings.COLOR_TEXT, (info_panel.x + 5, y_pos))
         y_pos += line_height
         
         # obstaculo terrestre
-        ground_dist = str(round(self.obstacle_detection['ground_distance'])) if self.obstacle_detection['ground_distance'] != float('inf') else "-"
-        ground_text = small_font.render(f"Ground: {ground_dist}", True, settings.COLOR_GROUND_OBSTACLE if self.obstacle_detection['ground_detected'] else settings.COLOR_TEXT)
-        self.screen.blit(ground_text, (info_panel.x + 5, y_pos))
+        observation = self.observation
+        ground_dist = str(round(observation.ground_distance)) if observation.ground_detected else "-"
+        text.blit(self.screen, small_font, f"Ground: {ground_dist}", settings.COLOR_GROUND_OBSTACLE if observation.ground_detected else settings.COLOR_TEXT, (info_panel.x + 5, y_pos))
         y_pos += line_height
         
         # obstaculo voador
-        flying_dist = str(round(self.obstacle_detection['flying_distance'])) if self.obstacle_detection['flying_distance'] != float('inf') else "-"
-        flying_text = small_font.render(f"Flying: {flying_dist}", True, settings.COLOR_FLYING_OBSTACLE if self.obstacle_detection['flying_detected'] else settings.COLOR_TEXT)
-        self.screen.blit(flying_text, (info_panel.x + 5, y_pos))
+        flying_dist = str(round(observation.flying_distance)) if observation.flying_detected else "-"
+        text.blit(self.screen, small_font, f"Flying: {flying_dist}", settings.COLOR_FLYING_OBSTACLE if observation.flying_detected else settings.COLOR_TEXT, (info_panel.x + 5, y_pos))
+        y_pos += line_height
+
+        #seção de tempo por fase (último episódio)
+        y_pos += 5
+        text.blit(self.screen, small_font, "Timing (us/step) [T]:", settings.COLOR_TEXT, (info_panel.x + 5, y_pos))
+        y_pos += line_height
+        per_step = self.timer.last_episode_per_step()
+        for phase in TIMING_PHASES:
+            value = f"{per_step[phase]:.0f}" if per_step else "-"
+            text.blit(self.screen, small_font, f"{phase}: {value}", settings.COLOR_TEXT, (info_panel.x + 5, y_pos))
+            y_pos += line_height
 
     def draw_game(self):
-        self.screen.fill(settings.COLOR_SKY)
-        pygame.draw.rect(self.screen, settings.COLOR_GROUND, pygame.Rect(0, settings.GROUND_LEVEL, settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT - settings.GROUND_LEVEL))
+        self.draw_background()
         
-        for entity in self.sprites:
-            if isinstance(entity, Dino):
-                if entity.is_alive:  # só os dinossauros vivos
-                    entity.draw(self.screen)
-            else:
-                entity.draw(self.screen)
-
-        for dino in self.dinos:
-            if dino.is_alive:
-                for i, ray in enumerate(dino.rays):
-                    # Cor diferente baseado no obstaculo atingido
-                    if not ray['hit']:
-                        ray_color = (255, 0, 0) # vermelho para nada
-                    elif ray['obstacle_type'] == 'ground':
+        for obstacle in self.obstacles:
+            obstacle.draw(self.screen)
+
+        population = self.population
+        alive_indices = np.flatnonzero(population.alive).tolist()
+        tops = population.top
+        heights = population.height
+
+        # só os dinossauros vivos
+        for i in alive_indices:
+            self.screen.blit(self.dino_images[int(heights[i])], (population.x, int(tops[i])))
+
+        centerx = population.centerx
+        centery = population.centery
+        for i in alive_indices:
+            ray_start = (centerx, int(centery[i]))
+            for ray_index in range(settings.RAYCOUNT):
+                hit_type = self.ray_hit_types[i, ray_index]
+                # Cor diferente baseado no obstaculo atingido
+                if hit_type == sensors.NO_HIT:
+                    ray_color = (255, 0, 0) # vermelho para nada
+                    # Se não acertou nada, o raio vai até o alcance máximo
+                    ray_end = sensors.ray_end(ray_start, ray_index, settings.RAY_LENGTH)
+                else:
+                    if hit_type == sensors.GROUND:
                         ray_color = (0, 255, 0)  # verde para cactus
-                    elif ray['obstacle_type'] == 'flying':
-                        ray_color = (255, 165, 0)  # laranja pra voador
                     else:
-                        ray_color = (0, 0, 0) # ???
-                    
-                    ray_start = (dino.rect.centerx, dino.rect.centery)
-                    
+                        ray_color = (255, 165, 0)  # laranja pra voador
                     # Se acertou algo, distancia vai apenas até o objeto
-                    if ray['hit']:
-                        angle = math.radians(settings.RAYS[i])
-                        ray_end = (
-                            int(ray_start[0] + ray['distance'] * math.cos(angle)),
-                            int(ray_start[1] + ray['distance'] * math.sin(angle))
-                        )
-                    else:
-                        angle = math.radians(settings.RAYS[i])
-                        ray_end = (
-                            int(ray_start[0] + settings.RAY_LENGTH * math.cos(angle)),
-                            int(ray_start[1] + settings.RAY_LENGTH * math.sin(angle))
-                        )
-                    
-                    pygame.draw.line(self.screen, ray_color, ray_start, ray_end, 2)
+                    ray_end = sensors.ray_end(ray_start, ray_index, self.ray_distances[i, ray_index])
+                
+                pygame.draw.line(self.screen, ray_color, ray_start, ray_end, 2)
 
         self.draw_info()
 
@@ -415,6 +484,14 @@ class Train(BaseAIGame):
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
+                elif event.key == pygame.K_m:
+                    self.render_mode = RENDER_MODES[(RENDER_MODES.index(self.render_mode) + 1) % len(RENDER_MODES)]
+                elif event.key == pygame.K_UP:
+                    self.steps_per_frame = min(self.steps_per_frame * 2, MAX_STEPS_PER_FRAME)
+                elif event.key == pygame.K_DOWN:
+                    self.steps_per_frame = max(self.steps_per_frame // 2, 1)
+                elif event.key == pygame.K_t:
+                    self.dump_timing()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if self.slider_rect.collidepoint(event.pos):
                     self.slider_dragging = True
@@ -428,22 +505,75 @@ class Train(BaseAIGame):
                 self.speed_multiplier = 0.1 + ratio * 19.9
                 self.training_fps = int(settings.TRAININGFPS * self.speed_multiplier)
 
+    def dump_timing(self, path=None):
+        path = path or settings.TIMING_CSV_FILE
+        try:
+            self.timer.to_csv(path)
+            print(f"Tempos por fase salvos em {path}")
+        except Exception as e:
+            print(f"Erro ao salvar os tempos: {e}")
+
+    def simulate(self, max_steps=None, deadline=None, until_generation_end=False):
+        # roda steps sem desenhar; para em max_steps, no deadline ou no fim da geração
+        # o input continua sendo lido a cada TRAINING_INPUT_POLL segundos
+        steps = 0
+        while self.running:
+            if max_steps is not None and steps >= max_steps:
+                break
+            self.update_game_state()
+            steps += 1
+            if until_generation_end and self.game_over:
+                break
+
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                break
+            if now - self.last_input_poll >= settings.TRAINING_INPUT_POLL:
+                self.last_input_poll = now
+                self.handle_input()
+        return steps
+
     def run(self):
         self.running = True
 
         if self.game_over: # Se está começando de um game over
              self.reset_game()
 
+        frame_time = 1.0 / settings.TRAINING_RENDER_FPS
+        step_debt = 0.0 #steps devidos no modo adaptativo
+        last_time = time.perf_counter()
+
         while self.running:     
             self.handle_input()
             if not self.running: 
                 break
-            self.update_game_state() 
-            self.draw_game()        
-            pygame.display.flip()
-            self.clock.tick(self.training_fps)
+
+            frame_start = time.perf_counter()
+            self.last_input_poll = frame_start
+            if self.render_mode == 'generation':
+                steps = self.simulate(until_generation_end=True)
+            elif self.render_mode == 'fixed':
+                steps = self.simulate(max_steps=self.steps_per_frame)
+            else:
+                # o slider define steps/s; se a simulação não couber no frame, a dívida é descartada
+                step_debt += (frame_start - last_time) * self.training_fps
+                owed = int(step_debt)
+                steps = self.simulate(max_steps=owed, deadline=frame_start + frame_time * settings.TRAINING_SIM_BUDGET)
+                step_debt = step_debt - owed if steps == owed else 0.0
+            last_time = frame_start
+
+            if steps > 0:
+                self.last_frame_steps = steps
+                self.timer.begin()
+                self.draw_game()        
+                pygame.display.flip()
+                self.timer.mark('draw')
+            self.timer.begin()
+            self.clock.tick(settings.TRAINING_RENDER_FPS)
+            self.timer.mark('tick')
 
         self.save_q_table()     
+        self.close_metrics()
         
         return self.score 
 
@@ -0,0 +1,102 @@
+import pygame
+import settings
+from train_ai import Train, read_training_config
+from course import load_course
+import argparse
+import time
+
+# Treino sem janela: mesmas regras do Train (BaseAIGame/Dino/Obstacle), mas
+# sem display, fontes, Surfaces, desenho ou clock.tick. Roda o mais rápido que a CPU deixar.
+class HeadlessTrain(Train):
+    def __init__(self, custom_config=None, report_every=10, seed=None, course=None):
+        super().__init__(None, custom_config, seed=seed, course=course)
+        self.report_every = report_every
+        self.total_steps = 0
+
+    def run(self, max_episodes=None, max_steps=None):
+        self.running = True
+
+        if self.game_over:
+            self.reset_game()
+
+        start_time = time.perf_counter()
+        last_report_time = start_time
+        last_report_steps = 0
+        last_reported_episode = self.episodes_this_session
+
+        try:
+            while self.running:
+                self.update_game_state()
+                self.total_steps += 1
+
+                if max_steps is not None and self.total_steps >= max_steps:
+                    break
+                if max_episodes is not None and self.episodes_this_session >= max_episodes:
+                    break
+
+                # relatório a cada report_every episódios
+                if self.report_every and self.episodes_this_session != last_reported_episode and self.episodes_this_session % self.report_every == 0:
+                    now = time.perf_counter()
+                    steps_per_sec = (self.total_steps - last_report_steps) / max(now - last_report_time, 1e-9)
+                    print(f"[headless] episódio {self.current_episode} | epsilon {self.epsilon:.3f} | melhor fitness {self.best_fitness} | {steps_per_sec:.0f} steps/s")
+                    last_report_time = now
+                    last_report_steps = self.total_steps
+                    last_reported_episode = self.episodes_this_session
+        except KeyboardInterrupt:
+            print("[headless] interrompido, salvando Q-table")
+
+        elapsed = time.perf_counter() - start_time
+        print(f"[headless] {self.total_steps} steps em {elapsed:.1f}s ({self.total_steps / max(elapsed, 1e-9):.0f} steps/s)")
+
+        self.save_q_table()
+        self.close_metrics()
+
+        return self.score
+
+def build_config(args):
+    # parte da configuração salva (ou dos settings) e sobrescreve com a linha de comando
+    config = read_training_config()
+    if config is None:
+        config = {
+            'ALPHA': settings.ALPHA,
+            'GAMMA': settings.GAMMA,
+            'EPSILON_INIT': settings.EPSILON_INIT,
+            'EPSILON_DECAY': settings.EPSILON_DECAY,
+            'EPSILON_MIN': settings.EPSILON_MIN,
+            'POPULATION_SIZE': settings.POPULATION_SIZE,
+        }
+    if args.population is not None:
+        config['POPULATION_SIZE'] = args.population
+    if args.alpha is not None:
+        config['ALPHA'] = args.alpha
+    if args.gamma is not None:
+        config['GAMMA'] = args.gamma
+    return config
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Treino headless (sem janela) do Dino")
+    parser.add_argument("--episodes", type=int, default=None, help="para depois de N episódios")
+    parser.add_argument("--steps", type=int, default=None, help="para depois de N steps de simulação")
+    parser.add_argument("--population", type=int, default=None)
+    parser.add_argument("--alpha", type=float, default=None)
+    parser.add_argument("--gamma", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None, help="seed do mundo e da exploração")
+    parser.add_argument("--report-every", type=int, default=10, help="episódios entre relatórios")
+    parser.add_argument("--export-json", default=None, help="exporta a Q-table final também em JSON")
+    parser.add_argument("--timing-csv", default=None, help="salva o tempo por fase de cada episódio em CSV")
+    parser.add_argument("--metrics", nargs="?", const=settings.METRICS_FILE, default=None, help="grava métricas por geração (.jsonl ou .csv)")
+    parser.add_argument("--course", default=None, help="treina num percurso da biblioteca (course.py) em vez de obstáculos sorteados")
+    parser.add_argument("--course-file", default=settings.COURSE_LIBRARY_FILE, help="biblioteca de percursos")
+    args = parser.parse_args()
+
+    course = load_course(args.course, args.course_file) if args.course else None
+    trainer = HeadlessTrain(build_config(args), report_every=args.report_every, seed=args.seed, course=course)
+    if args.metrics:
+        trainer.open_metrics(args.metrics)
+    trainer.run(max_episodes=args.episodes, max_steps=args.steps)
+    if args.export_json:
+        trainer.export_q_table_json(args.export_json)
+    if args.timing_csv:
+        trainer.dump_timing(args.timing_csv)
+
+    pygame.quit()
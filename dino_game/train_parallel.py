@@ -0,0 +1,232 @@
+import pygame
+import settings
+from base_game import BaseAIGame
+from train_ai import Train
+from train_headless import build_config
+from course import load_course
+from metrics import MetricsWriter, fitness_stats
+from q_table import QTable, N_STATES, N_ACTIONS
+from multiprocessing import shared_memory
+import multiprocessing
+import numpy as np
+import argparse
+import time
+import os
+
+# Treino paralelo: cada processo do pool roda o seu próprio mundo com uma fatia da população.
+# A Q-table do pai (base) fica em memória compartilhada e é lida por todos os processos;
+# no fim da geração cada processo escreve a tabela do seu melhor dinossauro no seu slot de candidatos,
+# e o processo principal copia o slot vencedor para a base. Nada de tabela passa por pickle.
+
+Q_VALUES_BYTES = N_STATES * N_ACTIONS * np.dtype(np.float32).itemsize
+TABLE_BYTES = Q_VALUES_BYTES + N_STATES # q-values float32 + visited (1 byte por estado)
+
+def table_views(buffer, offset=0):
+    # views (array, visited) de uma tabela guardada num buffer de memória compartilhada
+    array = np.ndarray((N_STATES, N_ACTIONS), dtype=np.float32, buffer=buffer, offset=offset)
+    visited = np.ndarray(N_STATES, dtype=bool, buffer=buffer, offset=offset + Q_VALUES_BYTES)
+    return array, visited
+
+# estado de cada processo do pool (criado no _init_worker)
+_worker = None
+_base_shm = None
+_candidates_shm = None
+
+def _init_worker(base_name, candidates_name, config, course):
+    global _worker, _base_shm, _candidates_shm
+    _base_shm = shared_memory.SharedMemory(name=base_name)
+    _candidates_shm = shared_memory.SharedMemory(name=candidates_name)
+
+    # a q_table do Train é a base compartilhada: os dinossauros leem dela (copy-on-write por linha)
+    base = QTable(*table_views(_base_shm.buf))
+    _worker = Train(None, config, q_table=base, course=course)
+
+def _run_generation(slot, epsilon, seed):
+    worker = _worker
+    worker.epsilon = epsilon
+    worker.reset_game()
+    if seed is not None:
+        worker.world.reset(seed)
+        worker.rng = np.random.default_rng(seed)
+
+    steps = 0
+    while not worker.game_over:
+        worker.update_game_state()
+        steps += 1
+
+    fitness = worker.population.fitness
+    best = int(np.argmax(fitness))
+
+    # tabela completa do melhor dessa fatia = base + linhas privadas dele
+    array, visited = table_views(_candidates_shm.buf, slot * TABLE_BYTES)
+    np.copyto(array, worker.q_table.array)
+    np.copyto(visited, worker.q_table.visited)
+    states, rows = worker.q_tables.touched_states(best)
+    array[states] = rows
+    visited[states] = True
+
+    return {
+        'slot': slot,
+        'best_fitness': int(fitness[best]),
+        'mean_fitness': float(fitness.mean()),
+        'fitness': fitness.copy(),
+        'rows_touched': int(worker.q_tables.row_count),
+        'steps': steps,
+    }
+
+class ParallelTrain(BaseAIGame):
+    def __init__(self, custom_config=None, workers=None, report_every=10, seed=None, course=None):
+        super().__init__(None, custom_config, seed=seed, course=course)
+        self.workers = workers or os.cpu_count() or 1
+        if not hasattr(self, 'population_size'):
+            self.population_size = settings.POPULATION_SIZE
+        self.report_every = report_every
+        self.seed_rng = np.random.default_rng(seed) if seed is not None else None
+
+        # cada processo fica com uma fatia da população (o total pode arredondar pra cima)
+        self.shard_size = max(1, -(-self.population_size // self.workers))
+        self.worker_config = dict(custom_config or {})
+        self.worker_config['POPULATION_SIZE'] = self.shard_size
+
+        self.best_fitness = 0
+        self.episodes_this_session = 0
+        self.total_steps = 0
+        self.states_touched = 0
+        self.metrics = None
+
+        # base e candidatos em memória compartilhada; a self.q_table passa a viver na base
+        self.base_shm = shared_memory.SharedMemory(create=True, size=TABLE_BYTES)
+        self.candidates_shm = shared_memory.SharedMemory(create=True, size=TABLE_BYTES * self.workers)
+        loaded = self.q_table
+        self.q_table = QTable(*table_views(self.base_shm.buf))
+        self.q_table.copy_from(loaded)
+
+    def select_best_dinosaur(self, results):
+        self.states_touched = 0
+        best = max(results, key=lambda result: result['best_fitness'])
+        if best['best_fitness'] <= 0:
+            return
+
+        self.best_fitness = best['best_fitness']
+        # o melhor de todos os processos vira a base da próxima geração
+        array, visited = table_views(self.candidates_shm.buf, best['slot'] * TABLE_BYTES)
+        # só as linhas que mudaram entram no próximo delta
+        changed = np.flatnonzero((self.q_table.array != array).any(axis=1) | (self.q_table.visited != visited))
+        self.q_table.mark_dirty(changed)
+        self.states_touched = len(changed)
+        np.copyto(self.q_table.array, array)
+        np.copyto(self.q_table.visited, visited)
+
+        print(f"Episódio {self.current_episode}: Melhor dinossauro no processo {best['slot']} com fitness {self.best_fitness}")
+
+    def open_metrics(self, path=None):
+        self.metrics = MetricsWriter(path or settings.METRICS_FILE)
+
+    def close_metrics(self):
+        if self.metrics is not None:
+            self.metrics.close()
+            self.metrics = None
+
+    def log_generation(self, results, elapsed):
+        if self.metrics is None:
+            return
+        steps = sum(result['steps'] for result in results)
+        record = {"episode": int(self.current_episode), "steps": steps}
+        record.update(fitness_stats(np.concatenate([result['fitness'] for result in results])))
+        record.update({
+            "epsilon": float(self.epsilon),
+            "q_table_size": len(self.q_table),
+            "states_touched": int(self.states_touched),
+            "rows_touched": sum(result['rows_touched'] for result in results),
+            "steps_per_sec": steps / max(elapsed, 1e-9),
+            "checkpoint_latency_ms": 1e3 * self.checkpoint_writer.last_latency if self.checkpoint_writer else 0.0,
+            "workers": self.workers,
+            "time": time.time(),
+        })
+        self.metrics.log(record)
+
+    def run(self, max_episodes=None):
+        start_time = time.perf_counter()
+        last_report_time = start_time
+        last_report_steps = 0
+
+        pool = multiprocessing.Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(self.base_shm.name, self.candidates_shm.name, self.worker_config, self.world.course),
+        )
+        try:
+            while max_episodes is None or self.episodes_this_session < max_episodes:
+                if self.seed_rng is not None:
+                    seeds = [int(seed) for seed in self.seed_rng.integers(0, 2**31, self.workers)]
+                else:
+                    seeds = [None] * self.workers
+                tasks = [(slot, self.epsilon, seeds[slot]) for slot in range(self.workers)]
+                generation_start = time.perf_counter()
+                results = pool.starmap(_run_generation, tasks)
+
+                self.select_best_dinosaur(results)
+                self.log_generation(results, time.perf_counter() - generation_start)
+                self.total_steps += sum(result['steps'] for result in results)
+
+                self.current_episode += 1
+                self.episodes_this_session += 1
+                self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+                if self.episodes_this_session % settings.CHECKPOINT_EVERY == 0:
+                    self.save_q_table(background=True)
+
+                if self.report_every and self.episodes_this_session % self.report_every == 0:
+                    now = time.perf_counter()
+                    steps_per_sec = (self.total_steps - last_report_steps) / max(now - last_report_time, 1e-9)
+                    print(f"[paralelo] episódio {self.current_episode} | epsilon {self.epsilon:.3f} | melhor fitness {self.best_fitness} | {steps_per_sec:.0f} steps/s ({self.workers} processos)")
+                    last_report_time = now
+                    last_report_steps = self.total_steps
+        except KeyboardInterrupt:
+            print("[paralelo] interrompido, salvando Q-table")
+        finally:
+            pool.terminate()
+            pool.join()
+
+        elapsed = time.perf_counter() - start_time
+        print(f"[paralelo] {self.total_steps} steps em {elapsed:.1f}s ({self.total_steps / max(elapsed, 1e-9):.0f} steps/s)")
+
+        self.save_q_table()
+        self.close_metrics()
+
+    def close(self):
+        self.flush_checkpoints()
+        # solta as views antes de fechar a memória compartilhada
+        self.q_table = self.q_table.copy()
+        self.base_shm.close()
+        self.base_shm.unlink()
+        self.candidates_shm.close()
+        self.candidates_shm.unlink()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Treino paralelo (vários processos, sem janela) do Dino")
+    parser.add_argument("--episodes", type=int, default=None, help="para depois de N gerações")
+    parser.add_argument("--workers", type=int, default=None, help="número de processos (padrão: todos os núcleos)")
+    parser.add_argument("--population", type=int, default=None, help="população total, dividida entre os processos")
+    parser.add_argument("--alpha", type=float, default=None)
+    parser.add_argument("--gamma", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None, help="seed dos mundos e da exploração")
+    parser.add_argument("--report-every", type=int, default=10, help="episódios entre relatórios")
+    parser.add_argument("--export-json", default=None, help="exporta a Q-table final também em JSON")
+    parser.add_argument("--metrics", nargs="?", const=settings.METRICS_FILE, default=None, help="grava métricas por geração (.jsonl ou .csv)")
+    parser.add_argument("--course", default=None, help="todos os processos treinam num percurso da biblioteca (course.py)")
+    parser.add_argument("--course-file", default=settings.COURSE_LIBRARY_FILE, help="biblioteca de percursos")
+    args = parser.parse_args()
+
+    course = load_course(args.course, args.course_file) if args.course else None
+    trainer = ParallelTrain(build_config(args), workers=args.workers, report_every=args.report_every, seed=args.seed, course=course)
+    if args.metrics:
+        trainer.open_metrics(args.metrics)
+    try:
+        trainer.run(max_episodes=args.episodes)
+        if args.export_json:
+            trainer.export_q_table_json(args.export_json)
+    finally:
+        trainer.close()
+
+    pygame.quit()
@@ -0,0 +1,138 @@
+import numpy as np
+import settings
+import sensors
+from world import World
+from population import Population
+from q_table import N_ACTIONS, N_STATES, encode_observations
+
+# Ambiente vetorizado estilo gym sobre as regras do BaseGame/BaseAIGame:
+# N mundos independentes (World, cada um com seu RNG e obstáculos), um dinossauro por mundo.
+# Ações 0-3 como em BaseAIGame.perform_action. Ambientes que terminam são resetados automaticamente.
+class DinoVecEnv:
+    # observation_mode "state": ids inteiros do estado (para Q-tables)
+    # observation_mode "features": float32 (N, 5) [dist. terrestre, dist. voador, agachado, velocidade y, velocidade do jogo]
+    # courses: percursos pré-gerados (course.Course), um por ambiente (repetidos em ciclo se faltarem)
+    def __init__(self, num_envs, seed=None, observation_mode="state", max_episode_steps=None, courses=None):
+        if observation_mode not in ("state", "features"):
+            raise ValueError(f"observation_mode inválido: {observation_mode}")
+        self.num_envs = num_envs
+        self.observation_mode = observation_mode
+        self.max_episode_steps = max_episode_steps
+        self.num_actions = N_ACTIONS
+        self.num_states = N_STATES
+
+        # uma seed diferente por mundo, derivada da seed do ambiente
+        world_seeds = np.random.SeedSequence(seed).generate_state(num_envs)
+        self.worlds = [World(seed=int(world_seed), headless=True) for world_seed in world_seeds]
+        if courses:
+            for i, world in enumerate(self.worlds):
+                world.set_course(courses[i % len(courses)])
+        self.population = Population(num_envs, x = 50)
+
+        self.episode_steps = np.zeros(num_envs, dtype=np.int64)
+        self.episode_returns = np.zeros(num_envs, dtype=np.float64)
+
+    def _ticks(self):
+        return np.fromiter((world.sim_clock.tick for world in self.worlds), dtype=np.int64, count=self.num_envs)
+
+    def _speeds(self, indices):
+        return np.fromiter((self.worlds[i].speed for i in indices), dtype=np.float64, count=len(indices))
+
+    def _observe(self, indices):
+        population = self.population
+        window = sensors.ray_x_window(population.centerx)
+        boxes, box_types = sensors.stack_boxes([self.worlds[i].boxes_in_range(*window) for i in indices])
+        distances, hit_types = sensors.cast_rays_batch(
+            np.full(len(indices), population.centerx), population.centery[indices], boxes, box_types
+        )
+        ground_dist, flying_dist = sensors.nearest_distances(distances, hit_types)
+        speeds = self._speeds(indices)
+
+        if self.observation_mode == "features":
+            features = np.empty((len(indices), 5), dtype=np.float32)
+            features[:, 0] = np.minimum(ground_dist, settings.RAY_LENGTH)
+            features[:, 1] = np.minimum(flying_dist, settings.RAY_LENGTH)
+            features[:, 2] = population.is_crouching[indices]
+            features[:, 3] = population.velocity_y[indices]
+            features[:, 4] = speeds
+            return features
+
+        return encode_observations(ground_dist, flying_dist, population.is_crouching[indices], population.velocity_y[indices], speeds)
+
+    def reset(self, seeds=None):
+        # seeds: None (continua o RNG de cada mundo) ou uma seed por ambiente
+        if seeds is None:
+            seeds = [None] * self.num_envs
+        if len(seeds) != self.num_envs:
+            raise ValueError(f"esperava {self.num_envs} seeds, recebeu {len(seeds)}")
+
+        for world, seed in zip(self.worlds, seeds):
+            world.reset(None if seed is None else int(seed))
+        self.population.reset()
+        self.episode_steps.fill(0)
+        self.episode_returns.fill(0)
+        return self._observe(np.arange(self.num_envs))
+
+    def step(self, actions):
+        # devolve (observações, recompensas, dones, info); info["terminal_observation"] tem a
+        # última observação dos ambientes que terminaram, já que eles voltam resetados
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"esperava {self.num_envs} ações, recebeu {actions.shape}")
+        population = self.population
+
+        population.apply_actions(actions, self._ticks())
+        for world in self.worlds:
+            world.update()
+        population.update(self._ticks())
+
+        boxes, _ = sensors.stack_boxes([world.boxes_in_range(population.x, population.x + population.width) for world in self.worlds])
+        collided = population.check_collisions(boxes)
+
+        # mesmas recompensas do treino, com o custo da ação tomada neste passo
+        speed_factor = np.minimum(1.0, np.abs(self._speeds(range(self.num_envs))) / 10)
+        rewards = settings.BASE_SURVIVAL_REWARD + (settings.SPEED_FACTOR_REWARD * speed_factor)
+        rewards[actions == 1] -= settings.JUMP_COST
+        rewards[actions == 2] -= settings.CROUCH_COST
+        rewards[collided] = -settings.COLLISION_COST
+
+        self.episode_steps += 1
+        self.episode_returns += rewards
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_episode_steps is not None:
+            truncated = ~collided & (self.episode_steps >= self.max_episode_steps)
+        dones = collided | truncated
+
+        observations = self._observe(np.arange(self.num_envs))
+        info = {"collided": collided, "truncated": truncated}
+
+        if dones.any():
+            done_indices = np.flatnonzero(dones)
+            info["terminal_observation"] = observations[done_indices].copy()
+            info["episode_steps"] = self.episode_steps[done_indices].copy()
+            info["episode_returns"] = self.episode_returns[done_indices].copy()
+
+            for i in done_indices:
+                self.worlds[i].reset()
+            population.reset(dones)
+            self.episode_steps[dones] = 0
+            self.episode_returns[dones] = 0
+            observations[done_indices] = self._observe(done_indices)
+
+        return observations, rewards, dones, info
+
+if __name__ == '__main__':
+    import time
+
+    # política aleatória, só para medir a vazão
+    env = DinoVecEnv(64, seed=0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    steps = 2000
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, dones, _ = env.step(rng.integers(0, N_ACTIONS, env.num_envs))
+        episodes += int(dones.sum())
+    elapsed = time.perf_counter() - start
+    print(f"{env.num_envs} ambientes: {steps * env.num_envs / elapsed:.0f} steps/s, {episodes} episódios")
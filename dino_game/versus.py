@@ -4,16 +4,16 @@ from dino import Dino
 from base_game import BaseAIGame
 
 class Versus(BaseAIGame):
-    def __init__(self, screen: pygame.Surface):
-        super().__init__(screen)
+    def __init__(self, screen: pygame.Surface, course=None):
+        super().__init__(screen, course=course, q_table_mmap_mode='c')
 
         # Player - controles por input
-        self.player_dino = Dino(x=50, y=settings.GROUND_LEVEL + 60)
+        self.player_dino = Dino(x=50, y=settings.GROUND_LEVEL + 60, sim_clock=self.sim_clock)
         self.player_dino.is_player = True
         self.sprites.add(self.player_dino)
         
         # AI  - controlado pela q-table e get_state
-        self.ai_dino = Dino(x=50, y=settings.GROUND_LEVEL + 60, alpha=180)
+        self.ai_dino = Dino(x=50, y=settings.GROUND_LEVEL + 60, alpha=180, sim_clock=self.sim_clock)
         self.ai_dino.color = settings.COLOR_VERSUS
         self.ai_dino.is_player = False
         self.sprites.add(self.ai_dino)
@@ -54,7 +54,7 @@ class Versus(BaseAIGame):
 
         #decisão da IA
         if self.ai_alive:
-            self.ai_dino.cast_rays(self.obstacles)
+            self.ai_dino.cast_rays(*self.sensed_boxes(self.ai_dino))
             current_state = self.get_state(self.ai_dino)
             action = self.choose_action(current_state)
             self.perform_action(self.ai_dino, action)
@@ -77,26 +77,23 @@ class Versus(BaseAIGame):
             self.game_over = True
 
     def draw_game(self):
-        # Draw background, ground, obstacles using parent method
-        self.screen.fill(settings.COLOR_SKY)
-        pygame.draw.rect(self.screen, settings.COLOR_GROUND, pygame.Rect(0, settings.GROUND_LEVEL, settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT - settings.GROUND_LEVEL))
+        # fundo (céu e chão em cache) e obstaculos
+        self.draw_background()
         
         #  obstaculos
         for obstacle in self.obstacles:
-            obstacle.draw(self.screen)
+            self.mark_dirty(obstacle.draw(self.screen))
 
         if self.ai_alive:
-            self.ai_dino.draw(self.screen)
+            self.mark_dirty(self.ai_dino.draw(self.screen))
             # AI name
-            ai_text = self.small_font.render("AI", True, settings.COLOR_VERSUS)
-            self.screen.blit(ai_text, (self.ai_dino.rect.centerx - 10, self.ai_dino.rect.top - 25))
+            self.mark_dirty(self.text_cache.blit(self.screen, self.small_font, "AI", settings.COLOR_VERSUS, (self.ai_dino.rect.centerx - 10, self.ai_dino.rect.top - 25)))
 
         
         if self.player_alive:
-            self.player_dino.draw(self.screen)
+            self.mark_dirty(self.player_dino.draw(self.screen))
             # Player name
-            player_text = self.small_font.render("Player", True, settings.COLOR_DINO)
-            self.screen.blit(player_text, (self.player_dino.rect.centerx - 25, self.player_dino.rect.top - 25))
+            self.mark_dirty(self.text_cache.blit(self.screen, self.small_font, "Player", settings.COLOR_DINO, (self.player_dino.rect.centerx - 25, self.player_dino.rect.top - 25)))
             
         
         
@@ -108,8 +105,7 @@ class Versus(BaseAIGame):
 
     def draw_game_over(self):
         super().draw_game_over()
-        result = self.font.render(self.versus_result, True, (255, 255, 255))
-        self.screen.blit(result, result.get_rect(center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 - 80)))
+        self.text_cache.blit(self.screen, self.font, self.versus_result, (255, 255, 255), center=(settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2 - 80))
         
     def reset_game(self):
         super().reset_game()
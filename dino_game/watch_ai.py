@@ -5,10 +5,10 @@ from base_game import BaseAIGame
 import numpy as np
 
 class Watch(BaseAIGame):
-    def __init__(self, screen: pygame.Surface):
-        super().__init__(screen)
+    def __init__(self, screen: pygame.Surface, course=None):
+        super().__init__(screen, course=course, q_table_mmap_mode='c')
 
-        self.dino = Dino(x=50, y=settings.GROUND_LEVEL + 60) 
+        self.dino = Dino(x=50, y=settings.GROUND_LEVEL + 60, sim_clock=self.sim_clock) 
         self.sprites.add(self.dino)
 
 
@@ -17,7 +17,7 @@ class Watch(BaseAIGame):
             return
 
         # passo 1: ai pega o estado atual e escohe ação
-        self.dino.cast_rays(self.obstacles) 
+        self.dino.cast_rays(*self.sensed_boxes(self.dino)) 
         current_state = self.get_state(self.dino)
         action = self.choose_action(current_state)
 
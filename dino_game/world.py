@@ -0,0 +1,83 @@
+import settings
+import random
+from obstacle import Obstacle
+from obstacle_pool import ObstaclePool
+from sim_clock import SimClock
+
+# Estado de um mundo de jogo: velocidade, timer de spawn, obstáculos, relógio e RNG próprios.
+# Nada é global, então vários mundos independentes podem rodar lado a lado no mesmo processo.
+class World:
+    def __init__(self, seed=None, headless=False, course=None):
+        self.headless = headless
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.sim_clock = SimClock()
+
+        # obstáculos como linhas de arrays reaproveitadas (ordem de spawn = ordem por x)
+        self.pool = ObstaclePool()
+        # sprites só pra desenhar, reaproveitados e sincronizados com o pool quando alguém itera obstacles
+        self.sprites = []
+        # percurso pré-gerado (course.Course): os obstáculos vêm dele em vez do RNG
+        self.course = course
+        self.course_index = 0
+        self.speed = settings.OBSTACLE_SPEED
+        self.obstacle_spawn_timer = 0
+
+    def spawn_obstacle(self):
+        # devolve a linha do pool do obstáculo novo
+        if self.course is not None:
+            row = self.pool.add(*self.course.obstacle(self.course_index))
+            self.course_index += 1
+            return row
+        return self.pool.spawn(self.rng)
+
+    def set_course(self, course):
+        # None volta a sortear ao vivo; vale a partir do próximo reset
+        self.course = course
+        self.course_index = 0
+
+    @property
+    def obstacles(self):
+        # sprites dos obstáculos ativos, na ordem por x
+        pool = self.pool
+        while len(self.sprites) < pool.count:
+            self.sprites.append(Obstacle(headless=self.headless))
+        for sprite, row in zip(self.sprites, pool.active_rows()):
+            yield sprite.sync(pool, row)
+
+    def boxes_in_range(self, left, right):
+        # blocos (K, 4) e tipos (K,) dos obstáculos com alguma parte entre left e right (x)
+        return self.pool.boxes_in_range(left, right)
+
+    def collides(self, rect):
+        return self.pool.collides(rect)
+
+    def update(self):
+        # devolve a linha do obstáculo criado neste passo (ou None)
+        self.sim_clock.advance()
+        # move os obstáculos e descarta os que saíram da tela
+        self.pool.update(self.speed)
+        self.speed -= settings.SPEED_INCREASE
+
+        # Spawn de obstaculos
+        self.obstacle_spawn_timer += 1
+        calculated_interval = settings.SPAWN_INTERVAL + (self.speed * settings.SPAWN_INTERVAL_SPEED_EFFECT)
+        spawn_interval = int(calculated_interval)
+        
+        if self.obstacle_spawn_timer >= spawn_interval:
+            self.obstacle_spawn_timer = 0
+            return self.spawn_obstacle()
+        return None
+
+    def reset(self, seed=None):
+        # seed None: continua a sequência do RNG (episódios diferentes)
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+
+        self.pool.clear()
+        self.course_index = 0 #o percurso recomeça do primeiro obstáculo
+
+        self.speed = settings.OBSTACLE_SPEED
+        self.obstacle_spawn_timer = 0
+        self.sim_clock.reset()
@@ -1,7 +1,6 @@
 import pygame
 import sys
 import os
-import json
 
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'dino_game')))
@@ -27,9 +26,9 @@ class App:
         if gamemode == "play":
             self.current_game_instance = game.Game(self.screen)
         elif gamemode == "train":
-            # Checa se qtable ja existe
-            q_table_file = "dino_q_table.json"
-            if not os.path.exists(q_table_file):
+            # Checa se qtable ja existe, se existe lê a configuração salva
+            config = train_ai.read_training_config()
+            if config is None:
                 # Tela de configuração se nao existir
                 config_screen = training_config.TrainingConfig(self.screen)
                 config = config_screen.run()
@@ -37,19 +36,6 @@ class App:
                 #sai se cancelar
                 if config is None:
                     return
-            else:
-                # se existe, lê a configuração existente
-                with open(q_table_file, 'r') as f:
-                    data = json.load(f)
-                    # Extrai os parâmetros
-                    training_params = data.get("training_params", {})
-                    config = {}
-                    config['ALPHA'] = training_params.get("alpha", settings.ALPHA)
-                    config['GAMMA'] = training_params.get("gamma", settings.GAMMA)
-                    config['EPSILON_INIT'] = data.get("epsilon", settings.EPSILON_INIT)
-                    config['EPSILON_DECAY'] = training_params.get("epsilon_decay", settings.EPSILON_DECAY)
-                    config['EPSILON_MIN'] = training_params.get("epsilon_min", settings.EPSILON_MIN)
-                    config['POPULATION_SIZE'] = training_params.get("population_size", settings.POPULATION_SIZE)
 
             self.current_game_instance = train_ai.Train(self.screen, config)
         elif gamemode == "watch":